@@ -0,0 +1,129 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+已有数据库的表由启动时的 create_all 建立，这里只创建缺失的表和列，
+对已有数据库和新数据库都可以直接执行 upgrade。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _existing_tables() -> set:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _existing_columns(table: str) -> set:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    tables = _existing_tables()
+
+    if "datasets" not in tables:
+        op.create_table(
+            "datasets",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("file_path", sa.String(length=500), nullable=True),
+            sa.Column("file_type", sa.String(length=50), nullable=True),
+            sa.Column("file_size", sa.Integer(), nullable=True),
+            sa.Column("encoding", sa.String(length=50), nullable=True),
+            sa.Column("content_hash", sa.String(length=64), nullable=True),
+            sa.Column("columnar_path", sa.String(length=500), nullable=True),
+            sa.Column("columns_info", sa.JSON(), nullable=True),
+            sa.Column("row_count", sa.Integer(), nullable=True),
+            sa.Column("profile_mode", sa.String(length=20), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_datasets_id", "datasets", ["id"])
+        op.create_index("ix_datasets_name", "datasets", ["name"])
+        op.create_index("ix_datasets_content_hash", "datasets", ["content_hash"])
+    else:
+        # 早期版本的数据集表缺少入库时新增的列
+        columns = _existing_columns("datasets")
+        added = [
+            sa.Column("encoding", sa.String(length=50), nullable=True),
+            sa.Column("content_hash", sa.String(length=64), nullable=True),
+            sa.Column("columnar_path", sa.String(length=500), nullable=True),
+            sa.Column("profile_mode", sa.String(length=20), nullable=True),
+        ]
+        missing = [column for column in added if column.name not in columns]
+        if missing:
+            with op.batch_alter_table("datasets") as batch_op:
+                for column in missing:
+                    batch_op.add_column(column)
+            if "content_hash" in {column.name for column in missing}:
+                op.create_index("ix_datasets_content_hash", "datasets", ["content_hash"])
+
+    if "analyses" not in tables:
+        op.create_table(
+            "analyses",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("dataset_id", sa.Integer(), nullable=False),
+            sa.Column("question", sa.Text(), nullable=False),
+            sa.Column("query_type", sa.String(length=100), nullable=True),
+            sa.Column("parameters", sa.JSON(), nullable=True),
+            sa.Column("chart_config", sa.JSON(), nullable=True),
+            sa.Column("insights", sa.JSON(), nullable=True),
+            sa.Column("reasoning", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+            sa.ForeignKeyConstraint(["dataset_id"], ["datasets.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_analyses_id", "analyses", ["id"])
+    else:
+        # 早期版本的分析表缺少参数和推理说明列
+        columns = _existing_columns("analyses")
+        added = [
+            sa.Column("parameters", sa.JSON(), nullable=True),
+            sa.Column("reasoning", sa.Text(), nullable=True),
+        ]
+        missing = [column for column in added if column.name not in columns]
+        if missing:
+            with op.batch_alter_table("analyses") as batch_op:
+                for column in missing:
+                    batch_op.add_column(column)
+
+    if "ingestion_jobs" not in tables:
+        op.create_table(
+            "ingestion_jobs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=True),
+            sa.Column("stage", sa.String(length=50), nullable=True),
+            sa.Column("progress", sa.Integer(), nullable=True),
+            sa.Column("file_name", sa.String(length=255), nullable=False),
+            sa.Column("file_path", sa.String(length=500), nullable=True),
+            sa.Column("file_type", sa.String(length=50), nullable=True),
+            sa.Column("file_size", sa.Integer(), nullable=True),
+            sa.Column("encoding", sa.String(length=50), nullable=True),
+            sa.Column("content_hash", sa.String(length=64), nullable=True),
+            sa.Column("profile_mode", sa.String(length=20), nullable=True),
+            sa.Column("dataset_id", sa.Integer(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["dataset_id"], ["datasets.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_ingestion_jobs_id", "ingestion_jobs", ["id"])
+        op.create_index("ix_ingestion_jobs_status", "ingestion_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_table("ingestion_jobs")
+    op.drop_table("analyses")
+    op.drop_table("datasets")
@@ -0,0 +1,38 @@
+"""add composite indexes for keyset pagination
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+数据集列表按 (is_active, id) 分页，分析历史按 (dataset_id, created_at DESC, id DESC) 分页。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def _existing_indexes(table: str) -> set:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    # 启动时的 create_all 可能已经建好索引
+    if "ix_datasets_is_active_id" not in _existing_indexes("datasets"):
+        op.create_index("ix_datasets_is_active_id", "datasets", ["is_active", "id"])
+    if "ix_analyses_dataset_id_created_at" not in _existing_indexes("analyses"):
+        op.create_index(
+            "ix_analyses_dataset_id_created_at",
+            "analyses",
+            ["dataset_id", sa.text("created_at DESC"), sa.text("id DESC")]
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analyses_dataset_id_created_at", table_name="analyses")
+    op.drop_index("ix_datasets_is_active_id", table_name="datasets")
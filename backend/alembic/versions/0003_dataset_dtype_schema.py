@@ -0,0 +1,43 @@
+"""add dtype schema and memory usage to datasets
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+记录入库时选定的紧凑列类型，以及按原始类型和紧凑类型加载时的内存字节数。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def _existing_columns(table: str) -> set:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    # 早期版本启动时用 create_all 建表，新建的数据库可能已有这些列
+    columns = _existing_columns("datasets")
+    added = [
+        sa.Column("dtype_schema", sa.JSON(), nullable=True),
+        sa.Column("memory_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("optimized_memory_bytes", sa.BigInteger(), nullable=True),
+    ]
+    missing = [column for column in added if column.name not in columns]
+    if missing:
+        with op.batch_alter_table("datasets") as batch_op:
+            for column in missing:
+                batch_op.add_column(column)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("datasets") as batch_op:
+        batch_op.drop_column("optimized_memory_bytes")
+        batch_op.drop_column("memory_bytes")
+        batch_op.drop_column("dtype_schema")
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 from .datasets import router as datasets_router
 from .analysis import router as analysis_router
+from .metrics import router as metrics_router
 
 api_router = APIRouter()
 
 # 包含各个模块的路由
 api_router.include_router(datasets_router, prefix="/datasets", tags=["datasets"])
-api_router.include_router(analysis_router, prefix="/analysis", tags=["analysis"]) 
\ No newline at end of file
+api_router.include_router(analysis_router, prefix="/analysis", tags=["analysis"])
+api_router.include_router(metrics_router, prefix="/metrics", tags=["metrics"]) 
\ No newline at end of file
@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
+import asyncio
+import json
 import os
 
-from app.core.database import get_db
+from app.core.database import get_db, AsyncSessionLocal
 from app.models.dataset import Dataset
 from app.models.analysis import Analysis
 from app.services.data_processor import data_processor
 from app.services.ai_analyzer import ai_analyzer
+from app.services.cache_keys import analysis_cache_key, query_cache_key
+from app.services.cache_metrics import analysis_cache_metrics
+from app.services.single_flight import single_flight
+from app.services.executor import task_executor
 from app.core.redis import cache
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -19,129 +29,489 @@ class AnalysisRequest(BaseModel):
     question: str
 
 
+class BatchAnalysisRequest(BaseModel):
+    dataset_id: int
+    questions: List[str]
+
+
 @router.post("/query", response_model=Dict[str, Any])
 async def analyze_data(
     request: AnalysisRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """分析数据并生成图表和洞察"""
     try:
         # 处理模拟数据集
         if request.dataset_id == 999:
-            # 使用本地CSV文件
-            csv_path = "uploads/9bdfa9d8-39f3-4428-8b23-a510d4c68179.csv"
-            if not os.path.exists(csv_path):
-                raise HTTPException(status_code=404, detail="演示数据文件不存在")
+            df, data_info = await _load_demo_data()
+            return await _run_analysis(request, data_info, db, df=df)
+        
+        # 获取数据集
+        dataset = await db.scalar(select(Dataset).where(
+            Dataset.id == request.dataset_id,
+            Dataset.is_active == True
+        ))
+        
+        if not dataset:
+            raise HTTPException(status_code=404, detail="数据集不存在")
+        
+        # 一次往返同时检查结果缓存和数据信息缓存
+        cache_key = analysis_cache_key(dataset, request.question)
+        cached_result, data_info = await cache.mget([
+            cache_key,
+            f"dataset:{request.dataset_id}:info"
+        ])
+        await analysis_cache_metrics.record(hit=bool(cached_result))
+        if cached_result:
+            return _with_question(cached_result, request.question)
+        
+        async def compute() -> Dict[str, Any]:
+            info = await _dataset_info(dataset, data_info)
+            return await _run_analysis(request, info, db, dataset=dataset, cache_key=cache_key)
+        
+        # 相同数据版本、相同问题的并发请求共享同一次计算，结果中的问题换成各自的原文
+        result = await single_flight.do(cache_key, compute)
+        return _with_question(result, request.question)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"分析失败: {str(e)}")
+
+
+@router.post("/query/stream")
+async def analyze_data_stream(
+    request: AnalysisRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """流式分析数据（Server-Sent Events）
+
+    依次推送 plan（查询计划）、chart（图表配置）、insight（洞察文本片段）、
+    insights（解析后的洞察）和 done 事件，图表不必等待洞察生成完成。
+    """
+    dataset = None
+    df = None
+    cache_key = None
+    cached_result = None
+    
+    if request.dataset_id == 999:
+        df, data_info = await _load_demo_data()
+    else:
+        dataset = await db.scalar(select(Dataset).where(
+            Dataset.id == request.dataset_id,
+            Dataset.is_active == True
+        ))
+        
+        if not dataset:
+            raise HTTPException(status_code=404, detail="数据集不存在")
+        
+        cache_key = analysis_cache_key(dataset, request.question)
+        cached_result, data_info = await cache.mget([
+            cache_key,
+            f"dataset:{request.dataset_id}:info"
+        ])
+        await analysis_cache_metrics.record(hit=bool(cached_result))
+    
+    async def events():
+        try:
+            if cached_result:
+                yield _sse_event("plan", {
+                    "query_type": cached_result.get("query_type"),
+                    "parameters": cached_result.get("parameters", {}),
+                    "reasoning": cached_result.get("reasoning", "")
+                })
+                yield _sse_event("chart", cached_result.get("chart_config"))
+                yield _sse_event("insights", cached_result.get("insights"))
+                yield _sse_event("done", {"analysis_id": cached_result.get("analysis_id")})
+                return
             
-            # 加载数据
-            df = data_processor.load_data(csv_path)
+            info = data_info if dataset is None else await _dataset_info(dataset, data_info)
             
-            # 获取数据信息
-            data_info = data_processor.analyze_dataframe(df)
-        else:
-            # 获取数据集
-            dataset = db.query(Dataset).filter(
-                Dataset.id == request.dataset_id,
-                Dataset.is_active == True
-            ).first()
+            query_analysis = await ai_analyzer.analyze_question(request.question, info)
+            yield _sse_event("plan", {
+                "query_type": query_analysis.get("query_type"),
+                "parameters": query_analysis.get("parameters", {}),
+                "reasoning": query_analysis.get("reasoning", "")
+            })
             
-            if not dataset:
-                raise HTTPException(status_code=404, detail="数据集不存在")
+            chart_data = await _query_chart_data(query_analysis, info, dataset=dataset, df=df)
+            yield _sse_event("chart", _chart_config(chart_data))
             
-            # 检查缓存
-            cache_key = f"analysis:{request.dataset_id}:{hash(request.question)}"
-            cached_result = await cache.get(cache_key)
-            if cached_result:
-                return cached_result
+            # 模型输出的文本片段原样转发，结束后整体解析
+            chunks = []
+            async for delta in ai_analyzer.stream_insights(request.question, chart_data, info):
+                chunks.append(delta)
+                yield _sse_event("insight", {"delta": delta})
+            insights = ai_analyzer.parse_insights("".join(chunks), request.question, chart_data)
+            yield _sse_event("insights", insights)
             
-            # 加载数据
-            df = data_processor.load_data(dataset.file_path)
+            # 响应开始后依赖注入的会话可能已关闭，保存记录使用独立会话
+            async with AsyncSessionLocal() as session:
+                analysis_id = await _save_analysis(session, request, dataset, query_analysis, chart_data, insights)
             
-            # 获取数据信息
-            data_info = await cache.get(f"dataset:{request.dataset_id}:info")
-            if not data_info:
-                data_info = data_processor.analyze_dataframe(df)
-                await cache.set(f"dataset:{request.dataset_id}:info", data_info, expire=3600)
+            if cache_key:
+                result = _analysis_result(request, analysis_id, query_analysis, chart_data, insights)
+                await cache.set(cache_key, result, expire=1800)
+            
+            yield _sse_event("done", {"analysis_id": analysis_id})
+        
+        except Exception as e:
+            # 响应头已发送，错误以事件形式通知客户端
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield _sse_event("error", {"detail": f"分析失败: {detail}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/batch", response_model=Dict[str, Any])
+async def analyze_batch(
+    request: BatchAnalysisRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """批量分析：同一数据集的多个问题只加载一次数据
 
-        # AI分析问题
-        query_analysis = await ai_analyzer.analyze_question(request.question, data_info)
+    模型调用并发受 BATCH_LLM_CONCURRENCY 限制；查询在同一份数据上执行，
+    相同的查询和分组聚合只计算一次；分析记录一次性批量写入。
+    """
+    if not request.questions:
+        raise HTTPException(status_code=400, detail="问题列表不能为空")
+    if len(request.questions) > settings.BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多分析{settings.BATCH_MAX_QUESTIONS}个问题"
+        )
+    
+    dataset = await db.scalar(select(Dataset).where(
+        Dataset.id == request.dataset_id,
+        Dataset.is_active == True
+    ))
+    
+    if not dataset:
+        raise HTTPException(status_code=404, detail="数据集不存在")
+    
+    try:
+        # 一次往返检查所有问题的结果缓存和数据信息缓存
+        cache_keys = [analysis_cache_key(dataset, question) for question in request.questions]
+        *cached_results, data_info = await cache.mget(
+            cache_keys + [f"dataset:{request.dataset_id}:info"]
+        )
+        hits = sum(1 for cached in cached_results if cached)
+        await analysis_cache_metrics.record_many(hits=hits, misses=len(cached_results) - hits)
+        info = await _dataset_info(dataset, data_info)
         
-        # 根据分析结果查询数据
-        chart_data = data_processor.query_data(df, query_analysis)
+        # 未命中缓存的问题，规范化后相同的问题只分析一次
+        pending = {}
+        for question, cache_key, cached in zip(request.questions, cache_keys, cached_results):
+            if not cached and cache_key not in pending:
+                pending[cache_key] = question
         
-        # 生成AI洞察
-        insights = await ai_analyzer.generate_insights(
-            request.question,
-            chart_data,
-            data_info
-        )
+        semaphore = asyncio.Semaphore(settings.BATCH_LLM_CONCURRENCY)
+        
+        async def analyze(question: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await ai_analyzer.analyze_question(question, info)
+        
+        query_analyses = dict(zip(
+            pending,
+            await asyncio.gather(*(analyze(question) for question in pending.values()))
+        ))
+        
+        chart_results = await _query_chart_data_batch(list(query_analyses.values()), info, dataset)
+        chart_by_key = dict(zip(query_analyses, chart_results))
+        
+        async def insights_for(cache_key: str) -> Any:
+            chart_data = chart_by_key[cache_key]
+            if "error" in chart_data:
+                return None
+            async with semaphore:
+                return await ai_analyzer.generate_insights(pending[cache_key], chart_data, info)
         
-        # 对于模拟数据集，不保存分析记录
-        if request.dataset_id != 999:
-            # 保存分析记录
-            analysis = Analysis(
+        insights_by_key = dict(zip(
+            pending,
+            await asyncio.gather(*(insights_for(cache_key) for cache_key in pending))
+        ))
+        
+        # 批量写入分析记录
+        analyses = {
+            cache_key: Analysis(
                 dataset_id=request.dataset_id,
-                question=request.question,
-                query_type=query_analysis.get("query_type"),
-                parameters=query_analysis.get("parameters", {}),
-                chart_config=chart_data,
-                insights={"insights": insights},
-                reasoning=query_analysis.get("reasoning", "")
+                question=question,
+                query_type=query_analyses[cache_key].get("query_type"),
+                parameters=query_analyses[cache_key].get("parameters", {}),
+                chart_config=chart_by_key[cache_key],
+                insights={"insights": insights_by_key[cache_key]},
+                reasoning=query_analyses[cache_key].get("reasoning", "")
             )
-            
-            db.add(analysis)
-            db.commit()
-            db.refresh(analysis)
-            analysis_id = analysis.id
-        else:
-            analysis_id = 999  # 模拟ID
-        
-        result = {
-            "analysis_id": analysis_id,
-            "question": request.question,
-            "query_type": query_analysis.get("query_type"),
-            "parameters": query_analysis.get("parameters", {}),
-            "chart_config": {
-                "chart_type": chart_data.get("chart_type", "bar"),  # 使用数据处理器返回的图表类型
-                "data": chart_data.get("data", []),
-                "x_axis": chart_data.get("x_axis"),
-                "y_axis": chart_data.get("y_axis")
-            },
-            "insights": insights,
-            "reasoning": query_analysis.get("reasoning", ""),
-            "created_at": "2025-01-19T00:00:00"  # 模拟时间
+            for cache_key, question in pending.items()
+            if "error" not in chart_by_key[cache_key]
         }
+        if analyses:
+            db.add_all(analyses.values())
+            await db.commit()
         
-        # 对于真实数据集缓存结果
-        if request.dataset_id != 999:
-            await cache.set(cache_key, result, expire=1800)  # 30分钟缓存
+        computed = {}
+        for cache_key, question in pending.items():
+            chart_data = chart_by_key[cache_key]
+            if "error" in chart_data:
+                computed[cache_key] = {"question": question, "error": chart_data["error"]}
+                continue
+            computed[cache_key] = _analysis_result(
+                AnalysisRequest(dataset_id=request.dataset_id, question=question),
+                analyses[cache_key].id,
+                query_analyses[cache_key],
+                chart_data,
+                insights_by_key[cache_key]
+            )
+        await cache.mset(
+            {key: result for key, result in computed.items() if "error" not in result},
+            expire=1800
+        )
         
-        return result
+        results = [
+            _with_question(cached or computed[cache_key], question)
+            for question, cache_key, cached in zip(request.questions, cache_keys, cached_results)
+        ]
+        return {
+            "dataset_id": request.dataset_id,
+            "total": len(results),
+            "failed": sum(1 for result in results if "error" in result),
+            "results": results
+        }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"分析失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"批量分析失败: {str(e)}")
+
+
+async def _load_demo_data():
+    """加载演示数据集及其数据信息"""
+    # 使用本地CSV文件
+    csv_path = "uploads/9bdfa9d8-39f3-4428-8b23-a510d4c68179.csv"
+    if not os.path.exists(csv_path):
+        raise HTTPException(status_code=404, detail="演示数据文件不存在")
+    
+    # 加载数据
+    df = await task_executor.run(data_processor.load_data, csv_path)
+    
+    # 获取数据信息
+    data_info = await task_executor.run(data_processor.analyze_dataframe, df)
+    return df, data_info
+
+
+async def _dataset_info(dataset: Dataset, cached_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """获取数据信息，优先使用缓存和入库时保存的列信息"""
+    if cached_info:
+        return cached_info
+    
+    info = dataset.columns_info
+    if not info:
+        info = await data_processor.aprofile_dataset(dataset)
+    await cache.set(f"dataset:{dataset.id}:info", info, expire=3600)
+    return info
+
+
+async def _run_analysis(
+    request: AnalysisRequest,
+    data_info: Dict[str, Any],
+    db: AsyncSession,
+    dataset: Optional[Dataset] = None,
+    df=None,
+    cache_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """执行问题分析、数据查询和洞察生成，真实数据集会保存并缓存结果"""
+    # AI分析问题
+    query_analysis = await ai_analyzer.analyze_question(request.question, data_info)
+    
+    chart_data = await _query_chart_data(query_analysis, data_info, dataset=dataset, df=df)
+    
+    # 生成AI洞察
+    insights = await ai_analyzer.generate_insights(
+        request.question,
+        chart_data,
+        data_info
+    )
+    
+    analysis_id = await _save_analysis(db, request, dataset, query_analysis, chart_data, insights)
+    result = _analysis_result(request, analysis_id, query_analysis, chart_data, insights)
+    
+    # 对于真实数据集缓存结果
+    if cache_key:
+        await cache.set(cache_key, result, expire=1800)  # 30分钟缓存
+    
+    return result
+
+
+async def _query_chart_data(
+    query_analysis: Dict[str, Any],
+    data_info: Dict[str, Any],
+    dataset: Optional[Dataset] = None,
+    df=None
+) -> Dict[str, Any]:
+    """根据问题分析结果查询图表数据"""
+    if df is None:
+        # 相同数据版本、相同查询的结果在不同问题之间共享
+        query_key = query_cache_key(dataset, query_analysis)
+        chart_data = await cache.get(query_key)
+        if chart_data is None:
+            # 只读取查询所需的列
+            columns = data_processor.get_query_columns(query_analysis, data_info)
+            df = await data_processor.aload_dataset(dataset, columns=columns)
+            chart_data = await task_executor.run(data_processor.query_data, df, query_analysis)
+            await cache.set(query_key, chart_data, expire=3600)
+        return chart_data
+    
+    # 根据分析结果查询数据，聚合计算在线程池中执行
+    return await task_executor.run(data_processor.query_data, df, query_analysis)
+
+
+async def _save_analysis(
+    db: AsyncSession,
+    request: AnalysisRequest,
+    dataset: Optional[Dataset],
+    query_analysis: Dict[str, Any],
+    chart_data: Dict[str, Any],
+    insights: Any
+) -> int:
+    """保存分析记录，返回记录ID"""
+    # 对于模拟数据集，不保存分析记录
+    if dataset is None:
+        return 999  # 模拟ID
+    
+    analysis = Analysis(
+        dataset_id=request.dataset_id,
+        question=request.question,
+        query_type=query_analysis.get("query_type"),
+        parameters=query_analysis.get("parameters", {}),
+        chart_config=chart_data,
+        insights={"insights": insights},
+        reasoning=query_analysis.get("reasoning", "")
+    )
+    
+    db.add(analysis)
+    await db.commit()
+    await db.refresh(analysis)
+    return analysis.id
+
+
+async def _query_chart_data_batch(
+    query_analyses: List[Dict[str, Any]],
+    data_info: Dict[str, Any],
+    dataset: Dataset
+) -> List[Dict[str, Any]]:
+    """批量查询图表数据：先查查询结果缓存，未命中的查询合并读取所需列后一次计算"""
+    query_keys = [query_cache_key(dataset, query_analysis) for query_analysis in query_analyses]
+    cached = await cache.mget(query_keys) if query_keys else []
+    
+    # 相同的查询只计算一次
+    missing = {}
+    for query_key, query_analysis, chart_data in zip(query_keys, query_analyses, cached):
+        if chart_data is None and query_key not in missing:
+            missing[query_key] = query_analysis
+    
+    computed = {}
+    if missing:
+        # 读取所有查询所需列的并集，任一查询需要全部列时读取全部列
+        columns: Optional[List[str]] = []
+        for query_analysis in missing.values():
+            needed = data_processor.get_query_columns(query_analysis, data_info)
+            if needed is None:
+                columns = None
+                break
+            columns.extend(col for col in needed if col not in columns)
+        
+        df = await data_processor.aload_dataset(dataset, columns=columns or None)
+        results = await task_executor.run(data_processor.query_batch, df, list(missing.values()))
+        computed = dict(zip(missing, results))
+        await cache.mset(
+            {key: chart_data for key, chart_data in computed.items() if "error" not in chart_data},
+            expire=3600
+        )
+    
+    return [
+        chart_data if chart_data is not None else computed[query_key]
+        for query_key, chart_data in zip(query_keys, cached)
+    ]
+
+
+def _chart_config(chart_data: Dict[str, Any]) -> Dict[str, Any]:
+    """返回给前端的图表配置"""
+    return {
+        **chart_data,  # 保留分箱、字段映射等图表附加信息
+        "chart_type": chart_data.get("chart_type", "bar"),  # 使用数据处理器返回的图表类型
+        "data": chart_data.get("data", []),
+        "x_axis": chart_data.get("x_axis"),
+        "y_axis": chart_data.get("y_axis")
+    }
+
+
+def _analysis_result(
+    request: AnalysisRequest,
+    analysis_id: int,
+    query_analysis: Dict[str, Any],
+    chart_data: Dict[str, Any],
+    insights: Any
+) -> Dict[str, Any]:
+    """组装分析结果"""
+    return {
+        "analysis_id": analysis_id,
+        "question": request.question,
+        "query_type": query_analysis.get("query_type"),
+        "parameters": query_analysis.get("parameters", {}),
+        "chart_config": _chart_config(chart_data),
+        "insights": insights,
+        "reasoning": query_analysis.get("reasoning", ""),
+        "created_at": "2025-01-19T00:00:00"  # 模拟时间
+    }
+
+
+def _with_question(result: Dict[str, Any], question: str) -> Dict[str, Any]:
+    """共享的分析结果按规范化问题缓存，返回前换成请求中的问题原文"""
+    return {**result, "question": question}
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """编码一条 Server-Sent Events 消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
 
 
 @router.get("/history/{dataset_id}")
 async def get_analysis_history(
     dataset_id: int,
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[int] = Query(None, ge=0, description="上一页最后一条分析记录的ID"),
+    limit: int = Query(20, ge=1, le=settings.PAGE_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db)
 ):
-    """获取数据集的分析历史"""
+    """获取数据集的分析历史，按创建时间倒序游标分页"""
     # 验证数据集存在
-    dataset = db.query(Dataset).filter(
+    dataset = await db.scalar(select(Dataset).where(
         Dataset.id == dataset_id,
         Dataset.is_active == True
-    ).first()
+    ))
     
     if not dataset:
         raise HTTPException(status_code=404, detail="数据集不存在")
     
-    # 获取分析历史
-    analyses = db.query(Analysis).filter(
-        Analysis.dataset_id == dataset_id
-    ).order_by(Analysis.created_at.desc()).limit(limit).all()
+    query = select(Analysis).where(Analysis.dataset_id == dataset_id)
+    if cursor is not None:
+        # 游标记录的创建时间在数据库内取出比较，避免时间格式在驱动间的差异
+        anchor = aliased(Analysis)
+        anchor_created_at = select(anchor.created_at).where(anchor.id == cursor).scalar_subquery()
+        query = query.where(or_(
+            Analysis.created_at < anchor_created_at,
+            and_(Analysis.created_at == anchor_created_at, Analysis.id < cursor)
+        ))
+    
+    # 多取一条判断是否还有下一页，走 (dataset_id, created_at DESC, id DESC) 索引
+    analyses = (await db.scalars(
+        query.order_by(Analysis.created_at.desc(), Analysis.id.desc()).limit(limit + 1)
+    )).all()
+    has_more = len(analyses) > limit
+    analyses = analyses[:limit]
     
     result = []
     for analysis in analyses:
@@ -156,14 +526,15 @@ async def get_analysis_history(
         "dataset_id": dataset_id,
         "dataset_name": dataset.name,
         "total_analyses": len(result),
-        "analyses": result
+        "analyses": result,
+        "next_cursor": analyses[-1].id if has_more else None
     }
 
 
 @router.get("/detail/{analysis_id}")
-async def get_analysis_detail(analysis_id: int, db: Session = Depends(get_db)):
+async def get_analysis_detail(analysis_id: int, db: AsyncSession = Depends(get_db)):
     """获取分析详情"""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    analysis = await db.scalar(select(Analysis).where(Analysis.id == analysis_id))
     
     if not analysis:
         raise HTTPException(status_code=404, detail="分析记录不存在")
@@ -180,9 +551,9 @@ async def get_analysis_detail(analysis_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/regenerate/{analysis_id}")
-async def regenerate_insights(analysis_id: int, db: Session = Depends(get_db)):
+async def regenerate_insights(analysis_id: int, db: AsyncSession = Depends(get_db)):
     """重新生成洞察"""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    analysis = await db.scalar(select(Analysis).where(Analysis.id == analysis_id))
     
     if not analysis:
         raise HTTPException(status_code=404, detail="分析记录不存在")
@@ -191,9 +562,10 @@ async def regenerate_insights(analysis_id: int, db: Session = Depends(get_db)):
         # 获取数据集信息
         data_info = await cache.get(f"dataset:{analysis.dataset_id}:info")
         if not data_info:
-            dataset = db.query(Dataset).filter(Dataset.id == analysis.dataset_id).first()
-            df = data_processor.load_data(dataset.file_path)
-            data_info = data_processor.analyze_dataframe(df)
+            dataset = await db.scalar(select(Dataset).where(Dataset.id == analysis.dataset_id))
+            data_info = dataset.columns_info
+            if not data_info:
+                data_info = await data_processor.aprofile_dataset(dataset)
         
         # 重新生成洞察
         new_insights = await ai_analyzer.generate_insights(
@@ -204,7 +576,7 @@ async def regenerate_insights(analysis_id: int, db: Session = Depends(get_db)):
         
         # 更新分析记录
         analysis.insights = {"insights": new_insights}
-        db.commit()
+        await db.commit()
         
         return {
             "analysis_id": analysis.id,
@@ -217,13 +589,13 @@ async def regenerate_insights(analysis_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/suggestions/{dataset_id}")
-async def get_analysis_suggestions(dataset_id: int, db: Session = Depends(get_db)):
+async def get_analysis_suggestions(dataset_id: int, db: AsyncSession = Depends(get_db)):
     """获取分析建议"""
     # 验证数据集存在
-    dataset = db.query(Dataset).filter(
+    dataset = await db.scalar(select(Dataset).where(
         Dataset.id == dataset_id,
         Dataset.is_active == True
-    ).first()
+    ))
     
     if not dataset:
         raise HTTPException(status_code=404, detail="数据集不存在")
@@ -231,8 +603,9 @@ async def get_analysis_suggestions(dataset_id: int, db: Session = Depends(get_db
     # 获取数据信息
     data_info = await cache.get(f"dataset:{dataset_id}:info")
     if not data_info:
-        df = data_processor.load_data(dataset.file_path)
-        data_info = data_processor.analyze_dataframe(df)
+        data_info = dataset.columns_info
+        if not data_info:
+            data_info = await data_processor.aprofile_dataset(dataset)
         await cache.set(f"dataset:{dataset_id}:info", data_info, expire=3600)
     
     # 基于数据特征生成建议问题
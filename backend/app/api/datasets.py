@@ -1,66 +1,124 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Optional
 import os
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.dataset import Dataset
+from app.models.ingestion_job import IngestionJob
 from app.services.data_processor import data_processor
+from app.services.ingestion import ingestion_queue
+from app.services.executor import task_executor
 from app.core.redis import cache
 
 router = APIRouter()
 
 
-@router.post("/upload", response_model=Dict[str, Any])
+@router.post("/upload", response_model=Dict[str, Any], status_code=202)
 async def upload_dataset(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    profile_mode: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """上传数据集文件"""
+    """上传数据集文件，解析和画像在后台任务中完成"""
     try:
+        # 先校验参数，避免参数错误时留下已保存的文件
+        data_processor.validate_profile_mode(profile_mode)
+        
         # 保存文件
-        file_path = await data_processor.save_uploaded_file(file)
+        file_path, content_hash = await data_processor.save_uploaded_file(file)
         
-        # 加载并分析数据
-        df = data_processor.load_data(file_path)
-        data_info = data_processor.analyze_dataframe(df)
+        # 检测文本编码，后续加载直接使用
+        file_type = os.path.splitext(file.filename)[1].lower()
+        encoding = data_processor.detect_encoding(file_path) if file_type == '.csv' else None
         
-        # 创建数据集记录
-        dataset = Dataset(
-            name=file.filename,
+        # 按行数选择画像模式需要扫描整个文件，放到执行器中避免阻塞事件循环
+        profile_mode = await task_executor.run(data_processor.resolve_profile_mode, file_path, profile_mode)
+        
+        # 创建入库任务记录
+        job = IngestionJob(
+            file_name=file.filename,
             file_path=file_path,
-            file_type=os.path.splitext(file.filename)[1].lower(),
+            file_type=file_type,
             file_size=os.path.getsize(file_path),
-            columns_info=data_info,
-            row_count=data_info["row_count"]
+            content_hash=content_hash,
+            encoding=encoding,
+            profile_mode=profile_mode
         )
         
-        db.add(dataset)
-        db.commit()
-        db.refresh(dataset)
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
         
-        # 缓存数据信息
-        await cache.set(f"dataset:{dataset.id}:info", data_info, expire=3600)
+        await ingestion_queue.submit(job.id, size_hint=job.file_size)
         
         return {
-            "id": dataset.id,
-            "name": dataset.name,
-            "file_type": dataset.file_type,
-            "file_size": dataset.file_size,
-            "row_count": dataset.row_count,
-            "column_count": data_info["column_count"],
-            "columns": data_info["columns"],
-            "message": "文件上传成功"
+            "job_id": job.id,
+            "status": job.status,
+            "profile_mode": profile_mode,
+            "message": "文件上传成功，正在后台处理"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[Dict[str, Any]])
-async def list_datasets(db: Session = Depends(get_db)):
-    """获取数据集列表"""
-    datasets = db.query(Dataset).filter(Dataset.is_active == True).all()
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_ingestion_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """获取入库任务的状态和进度，成功后返回生成的数据集"""
+    job = await db.scalar(select(IngestionJob).where(IngestionJob.id == job_id))
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="入库任务不存在")
+    
+    result = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "file_name": job.file_name,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "dataset": None
+    }
+    
+    if job.dataset_id:
+        dataset = await db.scalar(select(Dataset).where(Dataset.id == job.dataset_id))
+        if dataset:
+            result["dataset"] = {
+                "id": dataset.id,
+                "name": dataset.name,
+                "file_type": dataset.file_type,
+                "file_size": dataset.file_size,
+                "row_count": dataset.row_count,
+                "column_count": dataset.columns_info["column_count"],
+                "columns": dataset.columns_info["columns"],
+                "profile_mode": dataset.profile_mode
+            }
+    
+    return result
+
+
+@router.get("/", response_model=Dict[str, Any])
+async def list_datasets(
+    cursor: Optional[int] = Query(None, ge=0, description="上一页最后一个数据集的ID"),
+    limit: int = Query(50, ge=1, le=settings.PAGE_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取数据集列表，按ID游标分页"""
+    query = select(Dataset).where(Dataset.is_active == True)
+    if cursor is not None:
+        query = query.where(Dataset.id > cursor)
+    
+    # 多取一条判断是否还有下一页，走 (is_active, id) 索引
+    datasets = (await db.scalars(query.order_by(Dataset.id).limit(limit + 1))).all()
+    has_more = len(datasets) > limit
+    datasets = datasets[:limit]
     
     result = []
     for dataset in datasets:
@@ -74,13 +132,16 @@ async def list_datasets(db: Session = Depends(get_db)):
             "updated_at": dataset.updated_at.isoformat() if dataset.updated_at else None
         })
     
-    return result
+    return {
+        "data": result,
+        "next_cursor": datasets[-1].id if has_more else None
+    }
 
 
 @router.get("/{dataset_id}", response_model=Dict[str, Any])
-async def get_dataset(dataset_id: int, db: Session = Depends(get_db)):
+async def get_dataset(dataset_id: int, db: AsyncSession = Depends(get_db)):
     """获取数据集详情"""
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id, Dataset.is_active == True).first()
+    dataset = await db.scalar(select(Dataset).where(Dataset.id == dataset_id, Dataset.is_active == True))
     
     if not dataset:
         raise HTTPException(status_code=404, detail="数据集不存在")
@@ -89,10 +150,11 @@ async def get_dataset(dataset_id: int, db: Session = Depends(get_db)):
     data_info = await cache.get(f"dataset:{dataset_id}:info")
     
     if not data_info:
-        # 如果缓存中没有，重新加载数据
+        # 如果缓存中没有，优先使用入库时保存的列信息
         try:
-            df = data_processor.load_data(dataset.file_path)
-            data_info = data_processor.analyze_dataframe(df)
+            data_info = dataset.columns_info
+            if not data_info:
+                data_info = await data_processor.aprofile_dataset(dataset)
             await cache.set(f"dataset:{dataset_id}:info", data_info, expire=3600)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"数据加载失败: {str(e)}")
@@ -105,6 +167,11 @@ async def get_dataset(dataset_id: int, db: Session = Depends(get_db)):
         "file_size": dataset.file_size,
         "row_count": dataset.row_count,
         "columns": data_info["columns"],
+        "memory": {
+            "bytes": dataset.memory_bytes,
+            "optimized_bytes": dataset.optimized_memory_bytes,
+            "dtypes": dataset.dtype_schema or {}
+        },
         "created_at": dataset.created_at.isoformat(),
         "updated_at": dataset.updated_at.isoformat() if dataset.updated_at else None
     }
@@ -113,22 +180,25 @@ async def get_dataset(dataset_id: int, db: Session = Depends(get_db)):
 @router.get("/{dataset_id}/preview", response_model=Dict[str, Any])
 async def preview_dataset(
     dataset_id: int,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.PREVIEW_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db)
 ):
-    """预览数据集内容"""
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id, Dataset.is_active == True).first()
+    """分页预览数据集内容，只读取请求的行"""
+    dataset = await db.scalar(select(Dataset).where(Dataset.id == dataset_id, Dataset.is_active == True))
     
     if not dataset:
         raise HTTPException(status_code=404, detail="数据集不存在")
     
     try:
-        # 加载数据
-        df = data_processor.load_data(dataset.file_path)
+        # 按偏移读取一页数据，总行数来自元数据
+        df, total_rows = await task_executor.run(data_processor.read_rows, dataset, offset, limit)
         sample_data = data_processor.get_sample_data(df, limit)
         
         return {
-            "total_rows": len(df),
+            "total_rows": total_rows,
+            "offset": offset,
+            "limit": limit,
             "preview_rows": len(sample_data),
             "columns": list(df.columns),
             "data": sample_data
@@ -139,9 +209,9 @@ async def preview_dataset(
 
 
 @router.delete("/{dataset_id}")
-async def delete_dataset(dataset_id: int, db: Session = Depends(get_db)):
+async def delete_dataset(dataset_id: int, db: AsyncSession = Depends(get_db)):
     """删除数据集"""
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = await db.scalar(select(Dataset).where(Dataset.id == dataset_id))
     
     if not dataset:
         raise HTTPException(status_code=404, detail="数据集不存在")
@@ -149,10 +219,11 @@ async def delete_dataset(dataset_id: int, db: Session = Depends(get_db)):
     try:
         # 软删除
         dataset.is_active = False
-        db.commit()
+        await db.commit()
         
         # 删除缓存
         await cache.delete(f"dataset:{dataset_id}:info")
+        data_processor.frame_cache.invalidate(dataset_id)
         
         # 可选：删除物理文件
         # if os.path.exists(dataset.file_path):
@@ -165,7 +236,7 @@ async def delete_dataset(dataset_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/sample/{sample_type}")
-async def load_sample_dataset(sample_type: str, db: Session = Depends(get_db)):
+async def load_sample_dataset(sample_type: str, db: AsyncSession = Depends(get_db)):
     """加载示例数据集"""
     sample_datasets = {
         "sales": {
@@ -212,10 +283,9 @@ async def load_sample_dataset(sample_type: str, db: Session = Depends(get_db)):
     try:
         sample_info = sample_datasets[sample_type]
         
-        # 创建DataFrame并分析
+        # 创建DataFrame
         import pandas as pd
         df = pd.DataFrame(sample_info["data"])
-        data_info = data_processor.analyze_dataframe(df)
         
         # 保存为临时文件
         import tempfile
@@ -224,6 +294,9 @@ async def load_sample_dataset(sample_type: str, db: Session = Depends(get_db)):
             json.dump(sample_info["data"], f, ensure_ascii=False, indent=2)
             temp_file_path = f.name
         
+        # 分析数据并写入列式副本
+        data_info, columnar_path, dtype_info = data_processor.ingest_dataframe(df, temp_file_path)
+        
         # 创建数据集记录
         dataset = Dataset(
             name=sample_info["name"],
@@ -231,13 +304,15 @@ async def load_sample_dataset(sample_type: str, db: Session = Depends(get_db)):
             file_path=temp_file_path,
             file_type=".json",
             file_size=os.path.getsize(temp_file_path),
+            columnar_path=columnar_path,
             columns_info=data_info,
-            row_count=data_info["row_count"]
+            row_count=data_info["row_count"],
+            **dtype_info
         )
         
         db.add(dataset)
-        db.commit()
-        db.refresh(dataset)
+        await db.commit()
+        await db.refresh(dataset)
         
         # 缓存数据信息
         await cache.set(f"dataset:{dataset.id}:info", data_info, expire=3600)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+
+from app.services.data_processor import data_processor
+from app.services.cache_metrics import analysis_cache_metrics
+from app.core.redis import cache
+
+router = APIRouter()
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def get_cache_metrics():
+    """获取缓存命中统计"""
+    return {
+        "dataframe_cache": data_processor.frame_cache.stats(),
+        "cache": cache.stats(),
+        "analysis_cache": await analysis_cache_metrics.stats()
+    }
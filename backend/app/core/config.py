@@ -16,13 +16,28 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str = f"sqlite:///{BASE_DIR}/data_analysis.db"
+    DATABASE_ECHO: bool = False  # 是否打印SQL语句
+    DB_POOL_SIZE: int = 10  # 连接池常驻连接数
+    DB_MAX_OVERFLOW: int = 20  # 连接池允许的额外连接数
+    DB_POOL_PRE_PING: bool = True  # 取出连接前检测是否可用
+    DB_POOL_RECYCLE: int = 1800  # 连接回收秒数
     
     # Redis配置
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_MAX_CONNECTIONS: int = 50  # 连接池上限
+    REDIS_SOCKET_TIMEOUT: float = 2.0  # 单次命令超时秒数
+    REDIS_RETRY_INTERVAL: int = 30  # Redis故障后重试的间隔秒数
+    L1_CACHE_MAX_ENTRIES: int = 1024  # 进程内缓存条目上限
+    L1_CACHE_TTL: int = 60  # 进程内缓存过期秒数
     
     # OpenAI配置
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-3.5-turbo"
+    INSIGHTS_PROMPT_TOKEN_BUDGET: int = 1500  # 洞察提示词的估计token上限
+    QUESTION_CACHE_TTL: int = 30 * 24 * 3600  # 问题分析结果缓存秒数
+    QUESTION_CACHE_DB: str = str(BASE_DIR / "question_cache.db")  # Redis不可用时的SQLite缓存文件
+    BATCH_LLM_CONCURRENCY: int = 5  # 批量分析时同时进行的模型调用数
+    BATCH_MAX_QUESTIONS: int = 100  # 单次批量分析的问题数上限
     
     # CORS配置
     ALLOWED_HOSTS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:5173", "http://127.0.0.1:5173"]
@@ -30,8 +45,50 @@ class Settings(BaseSettings):
     # 文件上传配置
     UPLOAD_DIR: str = str(BASE_DIR / "uploads")
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB，流式写入的分块大小
+    ENCODING_SNIFF_BYTES: int = 64 * 1024  # 编码检测读取的字节数
     ALLOWED_FILE_TYPES: List[str] = [".csv", ".xlsx", ".xls", ".json"]
     
+    # 请求合并配置
+    SINGLE_FLIGHT_LEASE_TTL: int = 120  # 跨进程计算租约的过期秒数
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.2  # 等待其他进程结果的轮询间隔秒数
+    
+    # 数据画像配置
+    APPROX_PROFILE_ROW_THRESHOLD: int = 5_000_000  # 超过该行数时使用近似画像
+    PROFILE_CHUNK_SIZE: int = 200_000  # 分块读取的行数
+    
+    # 列类型优化配置
+    DTYPE_OPTIMIZATION_ENABLED: bool = True  # 入库时缩小整数位宽、文本列转为category
+    CATEGORY_MAX_UNIQUE_RATIO: float = 0.5  # 唯一值占行数比例不超过该值的文本列转为category
+    CATEGORY_MAX_UNIQUE: int = 100_000  # 转为category的文本列唯一值数上限
+    
+    # 分页配置
+    PAGE_MAX_LIMIT: int = 200  # 列表接口单页条数上限
+    
+    # 数据预览配置
+    PREVIEW_MAX_LIMIT: int = 1000  # 单页预览的行数上限
+    ROW_INDEX_STRIDE: int = 1000  # CSV行索引每隔多少行记录一次字节偏移
+    PARQUET_ROW_GROUP_SIZE: int = 64 * 1024  # 列式副本每个行组的行数，分页时只读取涉及的行组
+    
+    # 数据缓存配置
+    DATAFRAME_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB
+    
+    # 图表数据配置
+    HISTOGRAM_MAX_BINS: int = 100  # 直方图分箱数上限
+    TREND_MAX_POINTS: int = 1000  # 趋势图降采样后的数据点上限
+    CATEGORY_TOP_K: int = 20  # 对比图、饼图默认保留的分组数，其余合并为“其他”
+    CATEGORY_MAX_TOP_K: int = 100  # 请求可指定的分组数上限
+    CORRELATION_MAX_COLUMNS: int = 20  # 相关矩阵、统计摘要包含的数值列上限
+    
+    # 计算执行器配置
+    THREAD_POOL_SIZE: int = 8
+    PROCESS_POOL_SIZE: int = 2  # 为0时全部使用线程池
+    PROCESS_POOL_THRESHOLD: int = 20 * 1024 * 1024  # 数据文件超过该字节数时使用进程池
+    
+    # 后台任务配置
+    CELERY_BROKER_URL: str = ""  # 为空时入库任务在本进程的执行器中运行
+    CELERY_RESULT_BACKEND: str = ""
+    
     # JWT配置
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
@@ -1,32 +1,85 @@
+from typing import AsyncIterator
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
-# 创建数据库引擎
+
+def _async_database_url(url: str) -> str:
+    """把同步驱动的连接串转换为对应的异步驱动"""
+    if url.startswith('sqlite:'):
+        return url.replace('sqlite:', 'sqlite+aiosqlite:', 1)
+    if url.startswith(('postgresql:', 'postgresql+psycopg2:')):
+        return 'postgresql+asyncpg:' + url.split(':', 1)[1]
+    return url
+
+
+def _pool_options() -> dict:
+    """连接池参数，SQLite 使用驱动默认的连接池"""
+    if settings.DATABASE_URL.startswith('sqlite'):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE
+    }
+
+
+# 创建同步数据库引擎，供建表和后台任务使用
 if settings.DATABASE_URL.startswith('sqlite'):
     engine = create_engine(
         settings.DATABASE_URL,
         connect_args={"check_same_thread": False},
-        echo=settings.DEBUG
+        echo=settings.DATABASE_ECHO
     )
 else:
     engine = create_engine(
         settings.DATABASE_URL,
-        echo=settings.DEBUG
+        echo=settings.DATABASE_ECHO,
+        **_pool_options()
     )
 
+# 创建异步数据库引擎，供API请求使用（SQLite 使用 aiosqlite，PostgreSQL 使用 asyncpg）
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    echo=settings.DATABASE_ECHO,
+    **_pool_options()
+)
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 提交后不过期对象，避免在异步上下文中隐式加载属性
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # 创建基础模型类
 Base = declarative_base()
 
 
+def run_migrations() -> None:
+    """把数据库结构升级到最新的迁移版本
+
+    迁移对由早期版本 create_all 建立的数据库做了兼容，新旧数据库都可以直接升级。
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(settings.BASE_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(settings.BASE_DIR / "alembic"))
+    # 沿用应用自身的日志配置
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
 # 依赖注入：获取数据库会话
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
@@ -1,54 +1,315 @@
-import redis
+import redis.asyncio as redis
+import asyncio
 import json
-from typing import Any, Optional
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
 from .config import settings
+from .local_cache import LocalCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+# 创建有界连接池
+redis_pool = redis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+)
 
 # 创建Redis连接
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+# 跨进程缓存失效通知频道
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# 比较持有者后再删除锁，避免误删其他进程在锁过期后获取的新锁
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# 连接池耗尽是本进程的并发超过上限，不代表 Redis 故障
+POOL_EXHAUSTED_MESSAGES = ("Too many connections", "No connection available.")
+
+
+def is_redis_unavailable(error: Exception) -> bool:
+    """错误是否说明 Redis 服务不可达：连接失败或超时，不含连接池耗尽"""
+    if isinstance(error, redis.ConnectionError) and str(error) in POOL_EXHAUSTED_MESSAGES:
+        return False
+    return isinstance(error, (redis.ConnectionError, redis.TimeoutError))
 
 
 class CacheManager:
-    """缓存管理器"""
-    
-    def __init__(self):
-        self.client = redis_client
-    
+    """缓存管理器
+
+    两级缓存：进程内 L1（TTL + LRU）在前，Redis L2 在后。
+    删除操作通过 Redis 发布订阅通知其他 worker 清除各自的 L1；
+    Redis 不可用时降级为仅使用 L1，并在 REDIS_RETRY_INTERVAL 秒后重试。
+    client 可注入，测试时传入本地的 fake Redis 实例即可。
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.client = client if client is not None else redis_client
+        self.local = LocalCache(settings.L1_CACHE_MAX_ENTRIES, settings.L1_CACHE_TTL)
+        self.instance_id = uuid.uuid4().hex
+        self._redis_down_until = 0.0
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @property
+    def redis_available(self) -> bool:
+        """Redis 是否处于可用状态（故障后的重试间隔内视为不可用）"""
+        return time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception) -> None:
+        """记录 Redis 故障，进入仅 L1 模式"""
+        if self.redis_available:
+            logger.warning(f"Redis unavailable, falling back to local cache: {error}")
+        self._redis_down_until = time.monotonic() + settings.REDIS_RETRY_INTERVAL
+
+    def _handle_error(self, error: Exception) -> None:
+        """只有连接失败和超时才进入仅 L1 模式，其他错误（命令错误、连接池耗尽）只记录日志"""
+        if is_redis_unavailable(error):
+            self._mark_redis_down(error)
+        else:
+            logger.warning(f"Redis command error: {error}")
+
+    @staticmethod
+    def _dumps(key: str, value: Any) -> Optional[str]:
+        """序列化缓存值，无法序列化时返回 None"""
+        try:
+            return json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Cache value for {key} is not JSON serializable: {e}")
+            return None
+
     async def get(self, key: str) -> Optional[Any]:
         """获取缓存值"""
-        try:
-            value = self.client.get(key)
-            if value:
-                return json.loads(value)
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value
+
+        if not self.redis_available:
             return None
+        try:
+            value = await self.client.get(key)
         except Exception as e:
-            print(f"Redis get error: {e}")
+            self._handle_error(e)
             return None
-    
+
+        if not value:
+            return None
+        result = json.loads(value)
+        self.local.set(key, result)
+        return result
+
     async def set(self, key: str, value: Any, expire: int = 3600) -> bool:
         """设置缓存值"""
+        self.local.set(key, value, expire)
+
+        serialized_value = self._dumps(key, value)
+        if serialized_value is None or not self.redis_available:
+            return False
         try:
-            serialized_value = json.dumps(value, ensure_ascii=False)
-            return self.client.setex(key, expire, serialized_value)
+            return bool(await self.client.setex(key, expire, serialized_value))
         except Exception as e:
-            print(f"Redis set error: {e}")
+            self._handle_error(e)
             return False
-    
+
     async def delete(self, key: str) -> bool:
-        """删除缓存"""
+        """删除缓存，并通知其他 worker 清除本地副本"""
+        deleted = self.local.delete(key)
+
+        if not self.redis_available:
+            return deleted
+        message = json.dumps({"origin": self.instance_id, "key": key})
         try:
-            return bool(self.client.delete(key))
+            async with self.pipeline() as pipe:
+                pipe.delete(key)
+                pipe.publish(INVALIDATION_CHANNEL, message)
+                removed, _ = await pipe.execute()
+            return deleted or bool(removed)
         except Exception as e:
-            print(f"Redis delete error: {e}")
-            return False
-    
+            self._handle_error(e)
+            return deleted
+
     async def exists(self, key: str) -> bool:
         """检查键是否存在"""
+        if self.local.get(key) is not MISSING:
+            return True
+
+        if not self.redis_available:
+            return False
+        try:
+            return bool(await self.client.exists(key))
+        except Exception as e:
+            self._handle_error(e)
+            return False
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """一次往返获取多个缓存值，顺序与 keys 一致"""
+        results: List[Optional[Any]] = []
+        missing_keys = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is MISSING:
+                missing_keys.append(key)
+                value = None
+            results.append(value)
+
+        if not missing_keys or not self.redis_available:
+            return results
         try:
-            return bool(self.client.exists(key))
+            values = await self.client.mget(missing_keys)
         except Exception as e:
-            print(f"Redis exists error: {e}")
+            self._handle_error(e)
+            return results
+
+        fetched = {}
+        for key, value in zip(missing_keys, values):
+            if value:
+                fetched[key] = json.loads(value)
+                self.local.set(key, fetched[key])
+        return [fetched.get(key, result) for key, result in zip(keys, results)]
+
+    async def mset(self, mapping: Dict[str, Any], expire: int = 3600) -> bool:
+        """一次往返设置多个带过期时间的缓存值"""
+        if not mapping:
+            return True
+        serialized = {}
+        for key, value in mapping.items():
+            self.local.set(key, value, expire)
+            serialized_value = self._dumps(key, value)
+            if serialized_value is not None:
+                serialized[key] = serialized_value
+
+        if not serialized or not self.redis_available:
+            return False
+        try:
+            async with self.pipeline() as pipe:
+                for key, serialized_value in serialized.items():
+                    pipe.setex(key, expire, serialized_value)
+                results = await pipe.execute()
+            return len(serialized) == len(mapping) and all(results)
+        except Exception as e:
+            self._handle_error(e)
+            return False
+
+    async def incr(self, key: str, amount: int = 1) -> None:
+        """递增 Redis 计数器，计数器不进入 L1"""
+        if not self.redis_available:
+            return
+        try:
+            await self.client.incrby(key, amount)
+        except Exception as e:
+            self._handle_error(e)
+
+    async def incr_many(self, amounts: Dict[str, int]) -> None:
+        """一次往返递增多个 Redis 计数器"""
+        amounts = {key: amount for key, amount in amounts.items() if amount}
+        if not amounts or not self.redis_available:
+            return
+        try:
+            async with self.pipeline() as pipe:
+                for key, amount in amounts.items():
+                    pipe.incrby(key, amount)
+                await pipe.execute()
+        except Exception as e:
+            self._handle_error(e)
+
+    async def get_counters(self, keys: List[str]) -> Optional[List[int]]:
+        """读取 Redis 计数器，Redis 不可用时返回 None"""
+        if not self.redis_available:
+            return None
+        try:
+            values = await self.client.mget(keys)
+            return [int(value or 0) for value in values]
+        except Exception as e:
+            self._handle_error(e)
+            return None
+
+    async def acquire_lock(self, key: str, token: str, ttl: int) -> Optional[bool]:
+        """获取带过期时间的分布式锁，Redis 不可用时返回 None"""
+        if not self.redis_available:
+            return None
+        try:
+            return bool(await self.client.set(key, token, nx=True, ex=ttl))
+        except Exception as e:
+            self._handle_error(e)
+            return None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """仅当锁仍由自己持有时释放"""
+        if not self.redis_available:
+            return
+        try:
+            await self.client.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+        except Exception as e:
+            self._handle_error(e)
+
+    async def lock_exists(self, key: str) -> bool:
+        """检查锁是否仍被持有"""
+        if not self.redis_available:
             return False
+        try:
+            return bool(await self.client.exists(key))
+        except Exception as e:
+            self._handle_error(e)
+            return False
+
+    def pipeline(self, transaction: bool = False):
+        """创建管道，将多个命令合并为一次网络往返"""
+        return self.client.pipeline(transaction=transaction)
+
+    async def start_invalidation_listener(self) -> None:
+        """启动订阅失效通知的后台任务"""
+        if self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen_invalidations())
+
+    async def _listen_invalidations(self) -> None:
+        """订阅失效频道，清除其他 worker 删除的键；断线后清空 L1 并重连"""
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") != self.instance_id:
+                        self.local.delete(payload["key"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 断线期间可能错过失效通知，丢弃本地副本
+                self._handle_error(e)
+                self.local.clear()
+                await asyncio.sleep(settings.REDIS_RETRY_INTERVAL)
+            finally:
+                await pubsub.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存状态统计"""
+        return {
+            "l1": self.local.stats(),
+            "redis_available": self.redis_available
+        }
+
+    async def close(self) -> None:
+        """停止订阅并关闭连接池"""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        await self.client.aclose(close_connection_pool=True)
 
 
 # 全局缓存管理器实例
-cache = CacheManager() 
\ No newline at end of file
+cache = CacheManager()
@@ -1,4 +1,5 @@
 from .dataset import Dataset
 from .analysis import Analysis
+from .ingestion_job import IngestionJob
 
-__all__ = ["Dataset", "Analysis"] 
\ No newline at end of file
+__all__ = ["Dataset", "Analysis", "IngestionJob"] 
\ No newline at end of file
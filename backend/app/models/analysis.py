@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -21,5 +21,10 @@ class Analysis(Base):
     # 关联关系
     dataset = relationship("Dataset", backref="analyses")
     
+    __table_args__ = (
+        # 分析历史按数据集过滤、按时间倒序分页
+        Index("ix_analyses_dataset_id_created_at", dataset_id, created_at.desc(), id.desc()),
+    )
+    
     def __repr__(self):
         return f"<Analysis(id={self.id}, question='{self.question[:50]}...')>" 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Text, JSON, Boolean, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -13,11 +13,23 @@ class Dataset(Base):
     file_path = Column(String(500))
     file_type = Column(String(50))  # csv, xlsx, json
     file_size = Column(Integer)
+    encoding = Column(String(50))  # 文本文件编码，入库时检测
+    content_hash = Column(String(64), index=True)  # 文件内容的SHA-256
+    columnar_path = Column(String(500))  # 列式副本（Parquet）路径
     columns_info = Column(JSON)  # 存储列信息
     row_count = Column(Integer)
+    profile_mode = Column(String(20), default="exact")  # 画像模式：exact, approximate
+    dtype_schema = Column(JSON)  # 入库时选定的紧凑列类型 {列名: 类型}
+    memory_bytes = Column(BigInteger)  # 按原始类型加载时的内存字节数
+    optimized_memory_bytes = Column(BigInteger)  # 按紧凑类型加载时的内存字节数
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # 有效数据集列表按ID分页
+        Index("ix_datasets_is_active_id", is_active, id),
+    )
+    
     def __repr__(self):
         return f"<Dataset(id={self.id}, name='{self.name}')>" 
\ No newline at end of file
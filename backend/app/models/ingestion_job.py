@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class IngestionJob(Base):
+    """数据入库任务模型"""
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), default="pending", index=True)  # 任务状态：pending, running, succeeded, failed
+    stage = Column(String(50), default="queued")  # 当前阶段：queued, parsing, indexing, converting, profiling, optimizing, done
+    progress = Column(Integer, default=0)  # 进度百分比
+    file_name = Column(String(255), nullable=False)  # 用户上传的原始文件名
+    file_path = Column(String(500))
+    file_type = Column(String(50))
+    file_size = Column(Integer)
+    encoding = Column(String(50))
+    content_hash = Column(String(64))
+    profile_mode = Column(String(20), default="exact")
+    dataset_id = Column(Integer, ForeignKey("datasets.id"))  # 成功后生成的数据集
+    error = Column(Text)  # 失败原因
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<IngestionJob(id={self.id}, status='{self.status}')>"
@@ -0,0 +1,18 @@
+import pandas as pd
+
+# 长尾分组合并后的名称
+OTHER_LABEL = "其他"
+
+
+def top_k_with_other(totals: pd.Series, k: int, other_label: str = OTHER_LABEL) -> pd.Series:
+    """保留数值最大的 k 个分组，其余分组合并为“其他”
+
+    totals 为按分组聚合后的结果（索引为分组）。使用 nlargest 做部分选择，
+    代价随 k 增长而不是随分组数排序；“其他”的数值由总和减去前 k 项得到。
+    """
+    if len(totals) <= k:
+        return totals
+
+    top = totals.nlargest(k)
+    other = totals.sum() - top.sum()
+    return pd.concat([top, pd.Series([other], index=[other_label])])
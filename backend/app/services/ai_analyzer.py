@@ -1,13 +1,26 @@
 import openai
 import json
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List
 import pandas as pd
 from app.core.config import settings
+from app.services.prompt_builder import build_insights_prompt
+from app.services.cache_keys import question_analysis_cache_key
+from app.services.question_cache import question_cache
 
 
 class AIAnalyzer:
     """AI分析器"""
     
+    # 问题中的时间粒度关键词
+    GRANULARITY_KEYWORDS = {
+        "hour": ["每小时", "按小时", "小时"],
+        "day": ["每天", "每日", "按天", "按日", "日度"],
+        "week": ["每周", "按周", "周度"],
+        "month": ["每月", "按月", "月度"],
+        "quarter": ["每季度", "按季度", "季度"],
+        "year": ["每年", "按年", "年度"],
+    }
+    
     def __init__(self):
         if settings.OPENAI_API_KEY:
             openai.api_key = settings.OPENAI_API_KEY
@@ -16,13 +29,19 @@ class AIAnalyzer:
     async def analyze_question(self, question: str, data_info: Dict[str, Any]) -> Dict[str, Any]:
         """分析用户问题，确定查询类型和参数"""
         try:
-            # 构建提示词
-            prompt = self._build_question_analysis_prompt(question, data_info)
-            
             if not settings.OPENAI_API_KEY:
                 # 如果没有配置OpenAI API，返回默认分析
                 return self._default_question_analysis(question, data_info)
             
+            # 相同结构的数据集上问过的相同问题直接复用结果
+            cache_key = question_analysis_cache_key(data_info, question)
+            cached = await question_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            # 构建提示词
+            prompt = self._build_question_analysis_prompt(question, data_info)
+            
             # 调用OpenAI API
             response = await openai.ChatCompletion.acreate(
                 model=self.model,
@@ -35,8 +54,9 @@ class AIAnalyzer:
             )
             
             # 解析响应
-            result = response.choices[0].message.content
-            return json.loads(result)
+            result = json.loads(response.choices[0].message.content)
+            await question_cache.set(cache_key, result)
+            return result
         
         except Exception as e:
             print(f"AI question analysis error: {e}")
@@ -45,13 +65,13 @@ class AIAnalyzer:
     async def generate_insights(self, question: str, chart_data: Dict[str, Any], data_summary: Dict[str, Any]) -> List[Dict[str, Any]]:
         """生成数据洞察"""
         try:
-            # 构建提示词
-            prompt = self._build_insights_prompt(question, chart_data, data_summary)
-            
             if not settings.OPENAI_API_KEY:
                 # 如果没有配置OpenAI API，返回默认洞察
                 return self._default_insights(question, chart_data)
             
+            # 构建提示词
+            prompt = self._build_insights_prompt(question, chart_data, data_summary)
+            
             # 调用OpenAI API
             response = await openai.ChatCompletion.acreate(
                 model=self.model,
@@ -71,6 +91,42 @@ class AIAnalyzer:
             print(f"AI insights generation error: {e}")
             return self._default_insights(question, chart_data)
     
+    async def stream_insights(self, question: str, chart_data: Dict[str, Any], data_summary: Dict[str, Any]) -> AsyncIterator[str]:
+        """流式生成数据洞察，逐段返回模型输出的文本；未配置OpenAI API时不输出"""
+        if not settings.OPENAI_API_KEY:
+            return
+        
+        try:
+            prompt = self._build_insights_prompt(question, chart_data, data_summary)
+            response = await openai.ChatCompletion.acreate(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "你是一个数据分析专家，擅长从数据中发现洞察并提供建议。"},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.5,
+                max_tokens=1500,
+                stream=True
+            )
+            
+            async for chunk in response:
+                delta = getattr(chunk.choices[0].delta, "content", None)
+                if delta:
+                    yield delta
+        except Exception as e:
+            # 出错时停止输出，由 parse_insights 回退到默认洞察
+            print(f"AI insights stream error: {e}")
+    
+    def parse_insights(self, text: str, question: str, chart_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """解析流式输出拼接后的洞察文本，没有输出或解析失败时返回默认洞察"""
+        if not text:
+            return self._default_insights(question, chart_data)
+        try:
+            return json.loads(text)
+        except Exception as e:
+            print(f"AI insights parse error: {e}")
+            return self._default_insights(question, chart_data)
+    
     def _build_question_analysis_prompt(self, question: str, data_info: Dict[str, Any]) -> str:
         """构建问题分析提示词"""
         columns_info = "\n".join([
@@ -97,9 +153,13 @@ class AIAnalyzer:
         "time_column": "时间列名（用于趋势分析）",
         "value_column": "数值列名（如销售额、数量等）",
         "category_column": "分类列名（如产品、地区等，用于比较分析）",
-        "column": "目标列名（用于分布、统计摘要等）"
+        "column": "目标列名（用于分布、统计摘要等）",
+        "bins": "直方图分箱数（可选，仅数值分布需要，不指定时自动选择）",
+        "granularity": "时间粒度（可选，用于趋势分析）：hour|day|week|month|quarter|year",
+        "top_k": "保留的分组数（可选，用于对比、排名和占比分析，其余合并为其他）",
+        "order": "排序方向（可选，用于排名分析）：desc|asc"
     }},
-    "chart_suggestion": "line|bar|pie|scatter|histogram|boxplot|table",
+    "chart_suggestion": "line|bar|pie|scatter|histogram|boxplot|heatmap|table",
     "reasoning": "说明为何选择此分析类型和图表类型"
 }}
 
@@ -111,29 +171,13 @@ class AIAnalyzer:
         return prompt
     
     def _build_insights_prompt(self, question: str, chart_data: Dict[str, Any], data_summary: Dict[str, Any]) -> str:
-        """构建洞察生成提示词"""
-        prompt = f"""
-用户问题: "{question}"
-
-图表数据:
-{json.dumps(chart_data, ensure_ascii=False, indent=2)}
-
-数据摘要:
-{json.dumps(data_summary, ensure_ascii=False, indent=2)}
-
-请基于以上数据生成3-5个有价值的洞察，返回JSON格式:
-{{
-    "insights": [
-        {{
-            "type": "trend|pattern|anomaly|recommendation",
-            "title": "洞察标题",
-            "description": "详细描述",
-            "importance": "high|medium|low"
-        }}
-    ]
-}}
-"""
-        return prompt
+        """构建洞察生成提示词：发送图表数据的统计摘要和相关列画像，不超过 token 预算"""
+        return build_insights_prompt(
+            question,
+            chart_data,
+            data_summary,
+            settings.INSIGHTS_PROMPT_TOKEN_BUDGET
+        )
     
     def _default_question_analysis(self, question: str, data_info: Dict[str, Any]) -> Dict[str, Any]:
         """默认问题分析（当没有AI时）"""
@@ -142,28 +186,88 @@ class AIAnalyzer:
         
         # 简单的关键词匹配
         question_lower = question.lower()
+        category_col = self._pick_category_column(columns, data_info)
+        value_col = numeric_cols[0]['name'] if numeric_cols else None
+        
+        if len(numeric_cols) >= 2 and any(keyword in question_lower for keyword in ['相关', '关联', '关系']):
+            # 相关性分析，至少需要两个数值列
+            return {
+                "query_type": "correlation",
+                "parameters": {},
+                "chart_suggestion": "heatmap",
+                "reasoning": "检测到相关性分析关键词"
+            }
         
-        if any(keyword in question_lower for keyword in ['趋势', '变化', '时间', '月份', '年份']):
+        elif any(keyword in question_lower for keyword in ['排名', '排行', '最高', '最低', '最多', '最少', 'top']):
+            # 排名分析
+            return {
+                "query_type": "ranking",
+                "parameters": {
+                    "category_column": category_col,
+                    "value_column": value_col,
+                    "order": "asc" if any(keyword in question_lower for keyword in ['最低', '最少']) else "desc"
+                },
+                "chart_suggestion": "bar",
+                "reasoning": "检测到排名分析关键词"
+            }
+        
+        elif any(keyword in question_lower for keyword in ['占比', '比例', '份额', '构成']):
+            # 占比分析
+            return {
+                "query_type": "proportion",
+                "parameters": {
+                    "category_column": category_col,
+                    "value_column": value_col
+                },
+                "chart_suggestion": "pie",
+                "reasoning": "检测到占比分析关键词"
+            }
+        
+        elif any(keyword in question_lower for keyword in ['统计摘要', '描述统计', '中位数', '四分位', '平均值', '均值']):
+            # 统计摘要
+            return {
+                "query_type": "stat_summary",
+                "parameters": {
+                    "column": value_col
+                },
+                "chart_suggestion": "boxplot",
+                "reasoning": "检测到统计摘要关键词"
+            }
+        
+        elif any(keyword in question_lower for keyword in ['趋势', '变化', '时间', '月份', '年份']):
             # 趋势分析
             time_col = None
             value_col = None
             
-            # 寻找时间列
+            # 寻找时间列，优先使用入库时识别出的日期列
             for col in columns:
-                if any(time_word in col['name'].lower() for time_word in ['时间', '日期', '月', '年', 'time', 'date']):
+                if col.get('datetime_format') or 'datetime' in col['dtype']:
                     time_col = col['name']
                     break
+            else:
+                for col in columns:
+                    if any(time_word in col['name'].lower() for time_word in ['时间', '日期', '月', '年', 'time', 'date']):
+                        time_col = col['name']
+                        break
             
             # 寻找数值列
             if numeric_cols:
                 value_col = numeric_cols[0]['name']
             
+            parameters = {
+                "time_column": time_col,
+                "value_column": value_col
+            }
+            
+            # 识别时间粒度
+            for granularity, keywords in self.GRANULARITY_KEYWORDS.items():
+                if any(keyword in question_lower for keyword in keywords):
+                    parameters["granularity"] = granularity
+                    break
+            
             return {
                 "query_type": "trend",
-                "parameters": {
-                    "time_column": time_col,
-                    "value_column": value_col
-                },
+                "parameters": parameters,
                 "chart_suggestion": "line",
                 "reasoning": "检测到趋势分析关键词"
             }
@@ -215,6 +319,18 @@ class AIAnalyzer:
                 "reasoning": "默认基础分析"
             }
     
+    def _pick_category_column(self, columns: List[Dict[str, Any]], data_info: Dict[str, Any]):
+        """选择分类列：优先取唯一值较少的文本列"""
+        row_count = data_info.get('row_count', 0)
+        for col in columns:
+            if col['dtype'] in ('object', 'category', 'string') and not col.get('datetime_format') \
+                    and col['unique_count'] < row_count * 0.5:
+                return col['name']
+        for col in columns:
+            if col['unique_count'] < row_count * 0.5:
+                return col['name']
+        return None
+    
     def _default_insights(self, question: str, chart_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """默认洞察生成（当没有AI时）"""
         insights = [
@@ -0,0 +1,66 @@
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def histogram_bin_count(values: np.ndarray, max_bins: int) -> Dict[str, Any]:
+    """选择分箱数：四分位距大于0时用 Freedman–Diaconis 规则，否则用 Sturges 规则"""
+    n = len(values)
+    value_range = float(values.max() - values.min())
+    if value_range == 0:
+        return {"bins": 1, "method": "constant"}
+
+    q75, q25 = np.percentile(values, [75, 25])
+    iqr = q75 - q25
+    if iqr > 0:
+        width = 2 * iqr / n ** (1 / 3)
+        bins, method = math.ceil(value_range / width), "fd"
+    else:
+        bins, method = math.ceil(math.log2(n)) + 1, "sturges"
+
+    return {"bins": max(1, min(bins, max_bins)), "method": method}
+
+
+def _parse_bins(bins: Any) -> Optional[int]:
+    """解析请求的分箱数，来自模型输出的无效值（如 "auto"）视为未指定"""
+    if not bins:
+        return None
+    try:
+        return int(bins)
+    except (TypeError, ValueError, OverflowError):
+        print(f"Invalid bins hint ignored: {bins!r}")
+        return None
+
+
+def histogram(series: pd.Series, max_bins: int, bins: Optional[Any] = None) -> Dict[str, Any]:
+    """数值列直方图，返回分箱边界和计数，分箱数不超过 max_bins"""
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    values = values[np.isfinite(values)]
+
+    if len(values) == 0:
+        return {"edges": [], "counts": [], "method": "empty"}
+
+    requested = _parse_bins(bins)
+    if requested:
+        bin_count, method = max(1, min(requested, max_bins)), "requested"
+    else:
+        choice = histogram_bin_count(values, max_bins)
+        bin_count, method = choice["bins"], choice["method"]
+
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        # 所有值相同时 np.histogram 会自行扩展区间，这里保持单个区间 [v, v]
+        return {"edges": [low, high], "counts": [len(values)], "method": method}
+
+    if pd.api.types.is_integer_dtype(series.dtype):
+        # 整数列的分箱数不超过取值跨度，避免出现大量空箱
+        bin_count = min(bin_count, int(high - low) + 1)
+
+    counts, edges = np.histogram(values, bins=bin_count, range=(low, high))
+    return {
+        "edges": edges.tolist(),
+        "counts": counts.tolist(),
+        "method": method
+    }
@@ -0,0 +1,59 @@
+import hashlib
+import json
+import re
+import unicodedata
+
+
+def normalize_question(question: str) -> str:
+    """规范化问题文本：全角转半角、统一大小写、去掉空白和标点"""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = "".join(
+        ch for ch in text
+        if not unicodedata.category(ch).startswith(("P", "Z"))
+    )
+    return re.sub(r"\s+", "", text)
+
+
+def question_digest(question: str) -> str:
+    """规范化问题的稳定摘要，不受进程哈希随机化影响"""
+    return hashlib.sha256(normalize_question(question).encode("utf-8")).hexdigest()[:32]
+
+
+def dataset_fingerprint(dataset) -> str:
+    """数据集版本指纹：内容哈希加更新时间，数据变化后缓存自然失效"""
+    parts = [
+        dataset.content_hash or f"{dataset.file_path}:{dataset.file_size}",
+        dataset.updated_at.isoformat() if dataset.updated_at else ""
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def analysis_cache_key(dataset, question: str) -> str:
+    """分析结果缓存键"""
+    return f"analysis:{dataset.id}:{dataset_fingerprint(dataset)}:{question_digest(question)}"
+
+
+def query_cache_key(dataset, query_config) -> str:
+    """查询结果缓存键，只取决于数据版本、查询类型和参数，与问题的措辞无关"""
+    query = json.dumps(
+        {
+            "query_type": query_config.get("query_type", "basic"),
+            "parameters": query_config.get("parameters") or {}
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    digest = hashlib.sha256(query.encode("utf-8")).hexdigest()[:32]
+    return f"query:{dataset.id}:{dataset_fingerprint(dataset)}:{digest}"
+
+
+def schema_fingerprint(data_info) -> str:
+    """数据结构指纹：只取列名和类型，相同结构的数据集（如每月重新上传的导出）指纹相同"""
+    schema = [[col.get("name"), col.get("dtype")] for col in data_info.get("columns", [])]
+    return hashlib.sha256(json.dumps(schema, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def question_analysis_cache_key(data_info, question: str) -> str:
+    """问题分析结果缓存键"""
+    return f"question_analysis:{schema_fingerprint(data_info)}:{question_digest(question)}"
@@ -0,0 +1,56 @@
+from typing import Dict, Any
+
+from app.core.redis import cache
+
+
+class CacheMetrics:
+    """缓存命中统计
+
+    本进程计数之外同时递增 Redis 计数器，便于汇总所有 worker 的命中率。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    async def record(self, hit: bool) -> None:
+        """记录一次缓存查询结果"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        await cache.incr(f"metrics:{self.name}:{'hits' if hit else 'misses'}")
+
+    async def record_many(self, hits: int, misses: int) -> None:
+        """一次记录多次缓存查询结果，Redis 计数器只递增一次"""
+        self.hits += hits
+        self.misses += misses
+        await cache.incr_many({
+            f"metrics:{self.name}:hits": hits,
+            f"metrics:{self.name}:misses": misses
+        })
+
+    async def stats(self) -> Dict[str, Any]:
+        """本进程与全局（所有 worker）的命中统计"""
+        result = {"local": self._summary(self.hits, self.misses)}
+        counters = await cache.get_counters([
+            f"metrics:{self.name}:hits",
+            f"metrics:{self.name}:misses"
+        ])
+        if counters is not None:
+            result["global"] = self._summary(*counters)
+        return result
+
+    @staticmethod
+    def _summary(hits: int, misses: int) -> Dict[str, Any]:
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0
+        }
+
+
+# 分析结果缓存的命中统计
+analysis_cache_metrics = CacheMetrics("analysis_cache")
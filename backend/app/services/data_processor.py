@@ -1,12 +1,34 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import json
 import os
-from typing import Dict, Any, List, Optional
+import hashlib
+import codecs
+from typing import Callable, Dict, Any, Hashable, Iterator, List, Optional, Tuple
 from pathlib import Path
 import aiofiles
 from fastapi import UploadFile, HTTPException
 
 from app.core.config import settings
+from app.services.dataframe_cache import DataFrameCache
+from app.services.profiler import data_profiler
+from app.services.binning import histogram
+from app.services.downsampling import downsample_series
+from app.services.aggregation import top_k_with_other
+from app.services.dtype_optimizer import apply_dtypes, measure_dtypes, memory_bytes, plan_dtypes
+from app.services.row_index import build_csv_row_index, load_row_index, read_csv_rows
+from app.services.datetime_parser import (
+    GRANULARITY_FREQUENCIES,
+    add_datetime_columns,
+    datetime_column_name,
+    detect_datetime_formats,
+    format_bucket_labels,
+    is_datetime_column_name,
+    resolve_datetime_values,
+)
+from app.services.executor import task_executor, process_task
 
 
 class DataProcessor:
@@ -15,9 +37,11 @@ class DataProcessor:
     def __init__(self):
         self.upload_dir = Path(settings.UPLOAD_DIR)
         self.upload_dir.mkdir(exist_ok=True)
+        self.frame_cache = DataFrameCache(settings.DATAFRAME_CACHE_MAX_BYTES)
     
-    async def save_uploaded_file(self, file: UploadFile) -> str:
-        """保存上传的文件"""
+    async def save_uploaded_file(self, file: UploadFile) -> Tuple[str, str]:
+        """以分块流式方式保存上传的文件，返回文件路径和内容哈希"""
+        file_path = None
         try:
             # 验证文件类型
             file_ext = Path(file.filename).suffix.lower()
@@ -27,6 +51,10 @@ class DataProcessor:
                     detail=f"不支持的文件类型: {file_ext}，请上传 {', '.join(settings.ALLOWED_FILE_TYPES)} 格式的文件"
                 )
             
+            # 已知大小时提前拒绝
+            if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+                raise self._file_too_large_error(file.size)
+            
             # 确保上传目录存在
             self.upload_dir.mkdir(exist_ok=True)
             
@@ -35,56 +63,106 @@ class DataProcessor:
             unique_filename = f"{uuid.uuid4()}{file_ext}"
             file_path = self.upload_dir / unique_filename
             
-            # 读取文件内容
-            content = await file.read()
-            
-            # 验证文件大小
-            if len(content) > settings.MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=422,
-                    detail=f"文件大小超过限制: {len(content) / 1024 / 1024:.1f}MB > {settings.MAX_FILE_SIZE / 1024 / 1024}MB"
-                )
-            
-            # 保存文件
+            # 分块写入磁盘，同时累计大小并计算哈希
+            hasher = hashlib.sha256()
+            total_size = 0
             async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
+                while True:
+                    chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    
+                    total_size += len(chunk)
+                    if total_size > settings.MAX_FILE_SIZE:
+                        raise self._file_too_large_error(total_size)
+                    
+                    hasher.update(chunk)
+                    await f.write(chunk)
             
-            return str(file_path)
+            return str(file_path), hasher.hexdigest()
             
         except HTTPException:
+            self._remove_partial_file(file_path)
             raise
         except Exception as e:
+            self._remove_partial_file(file_path)
             raise HTTPException(
                 status_code=500,
                 detail=f"文件保存失败: {str(e)}"
             )
     
-    def load_data(self, file_path: str) -> pd.DataFrame:
-        """加载数据文件"""
+    def _file_too_large_error(self, size: int) -> HTTPException:
+        """构造文件过大错误"""
+        return HTTPException(
+            status_code=422,
+            detail=f"文件大小超过限制: {size / 1024 / 1024:.1f}MB > {settings.MAX_FILE_SIZE / 1024 / 1024}MB"
+        )
+    
+    def _remove_partial_file(self, file_path: Optional[Path]) -> None:
+        """清理写入失败的文件"""
+        if file_path is not None and file_path.exists():
+            file_path.unlink()
+    
+    def load_data(
+        self,
+        file_path: str,
+        columns: Optional[List[str]] = None,
+        columnar_path: Optional[str] = None,
+        encoding: Optional[str] = None,
+        dtype_schema: Optional[Dict[str, str]] = None
+    ) -> pd.DataFrame:
+        """加载数据文件，优先读取列式副本并只读取所需列
+
+        dtype_schema 为入库时选定的列类型方案，读取后按方案转换为紧凑类型。
+        """
+        df = self._read_data(file_path, columns=columns, columnar_path=columnar_path, encoding=encoding)
+        return apply_dtypes(df, dtype_schema) if dtype_schema else df
+    
+    def _read_data(
+        self,
+        file_path: str,
+        columns: Optional[List[str]] = None,
+        columnar_path: Optional[str] = None,
+        encoding: Optional[str] = None
+    ) -> pd.DataFrame:
+        """按文件格式读取数据"""
+        if columnar_path and os.path.exists(columnar_path):
+            try:
+                return pd.read_parquet(columnar_path, columns=columns or self._visible_columns(columnar_path))
+            except Exception as e:
+                print(f"Columnar load error: {e}")
+        
+        # 解析后的日期列只存在于列式副本中
+        if columns:
+            columns = [column for column in columns if not is_datetime_column_name(column)]
+        
         file_ext = Path(file_path).suffix.lower()
         
         try:
             if file_ext == '.csv':
-                # 尝试不同的编码
-                for encoding in ['utf-8', 'gbk', 'gb2312']:
-                    try:
-                        return pd.read_csv(file_path, encoding=encoding)
-                    except UnicodeDecodeError:
-                        continue
-                raise ValueError("无法解析CSV文件编码")
+                # 使用入库时检测的编码，只解析一次
+                encoding = encoding or self.detect_encoding(file_path)
+                try:
+                    return pd.read_csv(file_path, encoding=encoding, usecols=columns)
+                except UnicodeDecodeError:
+                    # 前缀只含ASCII、后文为中文编码时检测结果可能不准
+                    if encoding == 'gb18030':
+                        raise ValueError("无法解析CSV文件编码")
+                    return pd.read_csv(file_path, encoding='gb18030', usecols=columns)
             
             elif file_ext in ['.xlsx', '.xls']:
-                return pd.read_excel(file_path)
+                return pd.read_excel(file_path, usecols=columns)
             
             elif file_ext == '.json':
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     if isinstance(data, list):
-                        return pd.DataFrame(data)
+                        df = pd.DataFrame(data)
                     elif isinstance(data, dict):
-                        return pd.DataFrame([data])
+                        df = pd.DataFrame([data])
                     else:
                         raise ValueError("JSON格式不支持")
+                    return df[columns] if columns else df
             
             else:
                 raise ValueError(f"不支持的文件格式: {file_ext}")
@@ -95,38 +173,525 @@ class DataProcessor:
                 detail=f"文件解析失败: {str(e)}"
             )
     
-    def analyze_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """分析DataFrame的基本信息"""
+    def detect_encoding(self, file_path: str) -> str:
+        """根据文件开头的有限字节检测文本编码"""
+        with open(file_path, 'rb') as f:
+            prefix = f.read(settings.ENCODING_SNIFF_BYTES)
+            is_complete = not f.read(1)
+        
+        if prefix.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return 'utf-16'
+        
+        # 前缀可能截断在多字节字符中间，使用增量解码器避免误判
         try:
-            # 基本信息
-            info = {
-                "row_count": len(df),
-                "column_count": len(df.columns),
-                "columns": []
-            }
+            codecs.getincrementaldecoder('utf-8')().decode(prefix, final=is_complete)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            # GB18030 兼容 GBK 和 GB2312
+            return 'gb18030'
+    
+    def load_dataset(self, dataset, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """加载数据集记录对应的数据，命中缓存时跳过解析"""
+        fingerprint = self._source_fingerprint(dataset)
+        if fingerprint is not None:
+            df = self.frame_cache.get(dataset.id, columns, fingerprint)
+            if df is not None:
+                return df
+        
+        df = self.load_data(
+            dataset.file_path,
+            columns=columns,
+            columnar_path=dataset.columnar_path,
+            encoding=dataset.encoding,
+            dtype_schema=dataset.dtype_schema
+        )
+        
+        if fingerprint is not None:
+            self.frame_cache.put(dataset.id, columns, fingerprint, df)
+        
+        return df
+    
+    async def aload_dataset(self, dataset, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """异步加载数据集，缓存未命中时在执行器中解析，不阻塞事件循环"""
+        fingerprint = self._source_fingerprint(dataset)
+        if fingerprint is not None:
+            df = self.frame_cache.get(dataset.id, columns, fingerprint)
+            if df is not None:
+                return df
+        
+        df = await task_executor.run(
+            load_data_task,
+            dataset.file_path,
+            columns=columns,
+            columnar_path=dataset.columnar_path,
+            encoding=dataset.encoding,
+            dtype_schema=dataset.dtype_schema,
+            size_hint=dataset.file_size or 0
+        )
+        
+        if fingerprint is not None:
+            self.frame_cache.put(dataset.id, columns, fingerprint, df)
+        
+        return df
+    
+    def _source_fingerprint(self, dataset) -> Optional[Tuple[int, int]]:
+        """数据源文件的 (mtime, size) 指纹，文件不存在时返回None"""
+        source_path = dataset.columnar_path
+        if not source_path or not os.path.exists(source_path):
+            source_path = dataset.file_path
+        
+        try:
+            stat = os.stat(source_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _visible_columns(self, columnar_path: str) -> List[str]:
+        """列式副本中对外可见的列，不含解析后的日期列"""
+        return [
+            name for name in pq.read_schema(columnar_path).names
+            if not is_datetime_column_name(name)
+        ]
+    
+    def convert_to_columnar(
+        self,
+        df: pd.DataFrame,
+        file_path: str,
+        datetime_formats: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
+        """在原文件旁写入带类型的Parquet列式副本，失败时返回None
+
+        datetime_formats 中的列会额外写入解析后的日期列，查询时无需重复解析。
+        """
+        columnar_path = str(Path(file_path).with_suffix('.parquet'))
+        try:
+            add_datetime_columns(df, datetime_formats or {}).to_parquet(
+                columnar_path,
+                index=False,
+                row_group_size=settings.PARQUET_ROW_GROUP_SIZE
+            )
+            return columnar_path
+        except Exception as e:
+            # 混合类型的列等无法转换时，退回读取原始文件
+            print(f"Columnar conversion error: {e}")
+            if os.path.exists(columnar_path):
+                os.remove(columnar_path)
+            return None
+    
+    def iter_chunks(
+        self,
+        file_path: str,
+        columnar_path: Optional[str] = None,
+        encoding: Optional[str] = None
+    ) -> Iterator[pd.DataFrame]:
+        """分块读取数据文件，优先读取列式副本"""
+        chunk_size = settings.PROFILE_CHUNK_SIZE
+        
+        if columnar_path and os.path.exists(columnar_path):
+            parquet_file = pq.ParquetFile(columnar_path)
+            for batch in parquet_file.iter_batches(
+                batch_size=chunk_size,
+                columns=self._visible_columns(columnar_path)
+            ):
+                yield batch.to_pandas()
+            return
+        
+        if Path(file_path).suffix.lower() == '.csv':
+            encoding = encoding or self.detect_encoding(file_path)
+            yield from pd.read_csv(file_path, encoding=encoding, chunksize=chunk_size)
+            return
+        
+        # Excel和JSON没有流式解析器，整体加载后再切块
+        df = self.load_data(file_path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    
+    def estimate_row_count(self, file_path: str) -> Optional[int]:
+        """不解析文件估计CSV行数，其他格式返回None"""
+        if Path(file_path).suffix.lower() != '.csv':
+            return None
+        
+        line_count = 0
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(settings.UPLOAD_CHUNK_SIZE)
+                if not block:
+                    break
+                line_count += block.count(b'\n')
+        
+        # 去掉表头
+        return max(line_count - 1, 0)
+    
+    def validate_profile_mode(self, requested: Optional[str]) -> None:
+        """检查显式指定的画像模式，不需要读取文件"""
+        if requested and requested not in ("exact", "approximate"):
+            raise HTTPException(status_code=422, detail=f"不支持的画像模式: {requested}")
+    
+    def resolve_profile_mode(self, file_path: str, requested: Optional[str] = None) -> str:
+        """确定画像模式：显式指定优先，否则按行数阈值选择"""
+        if requested:
+            self.validate_profile_mode(requested)
+            return requested
+        
+        row_count = self.estimate_row_count(file_path)
+        if row_count is not None and row_count >= settings.APPROX_PROFILE_ROW_THRESHOLD:
+            return "approximate"
+        return "exact"
+    
+    def convert_file_to_columnar(
+        self,
+        file_path: str,
+        encoding: Optional[str] = None
+    ) -> Tuple[Optional[str], Dict[str, str]]:
+        """分块将原始文件写成Parquet副本，不把整个文件读入内存
+
+        日期列的格式由第一个分块检测，返回 (副本路径, 日期列格式)，失败时路径为None。
+        后续分块的类型与已写入的不一致时，统一这些列的类型后重新写入：
+        数值列统一为float64，其他列统一为文本。
+        """
+        columnar_path = str(Path(file_path).with_suffix('.parquet'))
+        column_types: Dict[str, str] = {}
+        try:
+            while True:
+                datetime_formats, drifted = self._write_columnar_chunks(
+                    file_path, columnar_path, encoding, column_types
+                )
+                if not drifted:
+                    break
+                if all(column_types.get(column) == kind for column, kind in drifted.items()):
+                    raise ValueError(f"列类型无法统一: {drifted}")
+                print(f"Columnar conversion retry with unified column types: {drifted}")
+                column_types.update(drifted)
             
-            # 分析每一列
-            for col in df.columns:
-                col_info = {
-                    "name": col,
-                    "dtype": str(df[col].dtype),
-                    "null_count": int(df[col].isnull().sum()),
-                    "unique_count": int(df[col].nunique()),
-                    "sample_values": df[col].dropna().head(5).tolist()
-                }
-                
-                # 数值型列的统计信息
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    col_info.update({
-                        "min": float(df[col].min()) if not pd.isna(df[col].min()) else None,
-                        "max": float(df[col].max()) if not pd.isna(df[col].max()) else None,
-                        "mean": float(df[col].mean()) if not pd.isna(df[col].mean()) else None,
-                        "std": float(df[col].std()) if not pd.isna(df[col].std()) else None
-                    })
-                
-                info["columns"].append(col_info)
+            if not os.path.exists(columnar_path):
+                return None, {}
+            return columnar_path, datetime_formats
+        except Exception as e:
+            print(f"Columnar conversion error: {e}")
+            if os.path.exists(columnar_path):
+                os.remove(columnar_path)
+            return None, {}
+    
+    def _write_columnar_chunks(
+        self,
+        file_path: str,
+        columnar_path: str,
+        encoding: Optional[str],
+        column_types: Dict[str, str]
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """逐块写入Parquet副本，返回 (日期列格式, 类型不一致的列)
+
+        出现类型不一致的列时停止写入，返回这些列应统一成的类型，由调用方重新写入。
+        """
+        writer = None
+        datetime_formats: Dict[str, str] = {}
+        try:
+            for chunk in self.iter_chunks(file_path, encoding=encoding):
+                chunk = self._unify_column_types(chunk, column_types)
+                if writer is None:
+                    datetime_formats = detect_datetime_formats(chunk)
+                frame = add_datetime_columns(chunk, datetime_formats)
+                if writer is None:
+                    table = pa.Table.from_pandas(frame, preserve_index=False)
+                    writer = pq.ParquetWriter(columnar_path, table.schema)
+                else:
+                    try:
+                        table = pa.Table.from_pandas(frame, schema=writer.schema, preserve_index=False)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        drifted = self._drifted_columns(frame, writer.schema)
+                        if not drifted:
+                            raise
+                        return datetime_formats, drifted
+                writer.write_table(table, row_group_size=settings.PARQUET_ROW_GROUP_SIZE)
+            return datetime_formats, {}
+        finally:
+            if writer is not None:
+                writer.close()
+    
+    @staticmethod
+    def _drifted_columns(frame: pd.DataFrame, schema: pa.Schema) -> Dict[str, str]:
+        """找出无法按已写入类型转换的列，返回 {列名: 统一后的类型}"""
+        drifted = {}
+        for field in schema:
+            if is_datetime_column_name(field.name) or field.name not in frame.columns:
+                continue
+            series = frame[field.name]
+            try:
+                pa.array(series, type=field.type, from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                numeric = pa.types.is_integer(field.type) or pa.types.is_floating(field.type) or pa.types.is_null(field.type)
+                if numeric and pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                    drifted[field.name] = "float64"
+                else:
+                    drifted[field.name] = "str"
+        return drifted
+    
+    @staticmethod
+    def _unify_column_types(chunk: pd.DataFrame, column_types: Dict[str, str]) -> pd.DataFrame:
+        """按统一类型转换分块中的列，缺失值保持为空"""
+        columns = [column for column in column_types if column in chunk.columns]
+        if not columns:
+            return chunk
+        chunk = chunk.copy(deep=False)
+        for column in columns:
+            series = chunk[column]
+            if column_types[column] == "float64":
+                # 本块出现文本时保持原样，由类型检查改为统一成文本
+                if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                    chunk[column] = series.astype("float64")
+            else:
+                chunk[column] = series.astype(str).where(series.notna())
+        return chunk
+    
+    def analyze_file(
+        self,
+        file_path: str,
+        columnar_path: Optional[str] = None,
+        encoding: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """分块流式生成近似画像"""
+        try:
+            return data_profiler.profile_chunks(
+                self.iter_chunks(file_path, columnar_path=columnar_path, encoding=encoding)
+            )
+        
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"数据分析失败: {str(e)}"
+            )
+    
+    def ingest_file(
+        self,
+        file_path: str,
+        encoding: Optional[str] = None,
+        profile_mode: str = "exact",
+        progress: Optional[Callable[[str, int], None]] = None
+    ) -> Tuple[Dict[str, Any], Optional[str], Dict[str, Any]]:
+        """解析并画像上传的文件，同时写入列式副本，返回 (列信息, 列式副本路径, 列类型信息)
+
+        progress 为可选的进度回调，参数为 (阶段, 百分比)。
+        列类型信息包含选定的类型方案和转换前后的内存字节数，对应数据集记录的同名字段。
+        """
+        report = progress or (lambda stage, percent: None)
+        
+        # CSV建立稀疏行索引，分页预览时按字节偏移定位
+        report("indexing", 8)
+        self.build_row_index(file_path, encoding)
+        
+        if profile_mode == "approximate":
+            # 大数据集分块转换和画像，不整体读入内存
+            report("converting", 10)
+            columnar_path, datetime_formats = self.convert_file_to_columnar(file_path, encoding=encoding)
+            report("profiling", 60)
+            data_info = self.analyze_file(file_path, columnar_path=columnar_path, encoding=encoding)
             
-            return info
+            # 分块写入时各块的category编码不一致，类型方案在加载时应用，这里逐块统计内存
+            report("optimizing", 85)
+            dtype_schema = self.choose_dtypes(data_info, datetime_formats)
+            before, after = measure_dtypes(
+                self.iter_chunks(file_path, columnar_path=columnar_path, encoding=encoding),
+                dtype_schema
+            )
+        else:
+            # 加载并分析数据
+            report("parsing", 10)
+            df = self.load_data(file_path, encoding=encoding)
+            return self.ingest_dataframe(df, file_path, progress=report)
+        
+        self._annotate_datetime_columns(data_info, datetime_formats if columnar_path else {})
+        return data_info, columnar_path, self._dtype_info(dtype_schema, before, after)
+    
+    def choose_dtypes(self, data_info: Dict[str, Any], datetime_formats: Dict[str, str]) -> Dict[str, str]:
+        """按配置选择列类型方案，日期列保留原始文本；未启用时返回空方案"""
+        if not settings.DTYPE_OPTIMIZATION_ENABLED:
+            return {}
+        return plan_dtypes(
+            data_info,
+            settings.CATEGORY_MAX_UNIQUE_RATIO,
+            settings.CATEGORY_MAX_UNIQUE,
+            exclude=datetime_formats
+        )
+    
+    @staticmethod
+    def _dtype_info(dtype_schema: Dict[str, str], before: int, after: int) -> Dict[str, Any]:
+        """列类型信息，字段与数据集记录一致"""
+        return {
+            "dtype_schema": dtype_schema,
+            "memory_bytes": before,
+            "optimized_memory_bytes": after
+        }
+    
+    def build_row_index(self, file_path: str, encoding: Optional[str] = None) -> Optional[str]:
+        """为CSV文件建立稀疏行索引，其他格式和UTF-16编码返回None"""
+        if Path(file_path).suffix.lower() != '.csv':
+            return None
+        encoding = encoding or self.detect_encoding(file_path)
+        if encoding.startswith('utf-16'):
+            return None
+        return build_csv_row_index(file_path, settings.ROW_INDEX_STRIDE)
+    
+    def read_rows(self, dataset, offset: int, limit: int) -> Tuple[pd.DataFrame, int]:
+        """按 offset/limit 读取一页数据，返回 (数据, 总行数)
+
+        列式副本只读取涉及的行组；CSV按行索引定位字节偏移后读取；
+        两者的总行数都来自元数据，不需要加载整个文件。
+        """
+        if dataset.columnar_path and os.path.exists(dataset.columnar_path):
+            try:
+                return self._read_parquet_rows(dataset.columnar_path, offset, limit)
+            except Exception as e:
+                print(f"Columnar read error: {e}")
+        
+        file_path = dataset.file_path
+        if Path(file_path).suffix.lower() == '.csv':
+            encoding = dataset.encoding or self.detect_encoding(file_path)
+            index = load_row_index(file_path)
+            if index is not None:
+                return read_csv_rows(file_path, index, offset, limit, encoding), index["row_count"]
+            # 没有行索引时流式跳过前面的行
+            df = pd.read_csv(file_path, encoding=encoding, skiprows=range(1, offset + 1), nrows=limit)
+            return df, dataset.row_count or offset + len(df)
+        
+        # Excel和JSON没有随机读取能力，整体加载（命中数据缓存时无需解析）后切片
+        df = self.load_dataset(dataset)
+        return df.iloc[offset:offset + limit], len(df)
+    
+    def _read_parquet_rows(self, columnar_path: str, offset: int, limit: int) -> Tuple[pd.DataFrame, int]:
+        """从列式副本读取覆盖 [offset, offset + limit) 的行组并切片"""
+        parquet_file = pq.ParquetFile(columnar_path)
+        metadata = parquet_file.metadata
+        columns = [name for name in parquet_file.schema_arrow.names if not is_datetime_column_name(name)]
+        
+        row_groups = []
+        first_row = 0
+        group_start = 0
+        for i in range(metadata.num_row_groups):
+            num_rows = metadata.row_group(i).num_rows
+            if first_row + num_rows > offset and first_row < offset + limit:
+                if not row_groups:
+                    group_start = first_row
+                row_groups.append(i)
+            first_row += num_rows
+        
+        if not row_groups:
+            return pd.DataFrame(columns=columns), metadata.num_rows
+        
+        table = parquet_file.read_row_groups(row_groups, columns=columns)
+        return table.slice(offset - group_start, limit).to_pandas(), metadata.num_rows
+    
+    def ingest_dataframe(
+        self,
+        df: pd.DataFrame,
+        file_path: str,
+        progress: Optional[Callable[[str, int], None]] = None
+    ) -> Tuple[Dict[str, Any], Optional[str], Dict[str, Any]]:
+        """画像已加载的数据并写入列式副本，返回 (列信息, 列式副本路径, 列类型信息)"""
+        report = progress or (lambda stage, percent: None)
+        
+        # 画像基于原始类型，列信息与类型优化无关
+        report("profiling", 50)
+        data_info = self.analyze_dataframe(df)
+        datetime_formats = detect_datetime_formats(df)
+        
+        # 缩小整数位宽、低基数文本列转为category，列式副本直接保存紧凑类型
+        report("optimizing", 60)
+        dtype_schema = self.choose_dtypes(data_info, datetime_formats)
+        optimized = apply_dtypes(df, dtype_schema)
+        
+        # 写入列式副本，日期列解析一次后随副本保存，后续查询直接读取
+        report("converting", 70)
+        columnar_path = self.convert_to_columnar(optimized, file_path, datetime_formats=datetime_formats)
+        
+        self._annotate_datetime_columns(data_info, datetime_formats if columnar_path else {})
+        return data_info, columnar_path, self._dtype_info(dtype_schema, memory_bytes(df), memory_bytes(optimized))
+    
+    @staticmethod
+    def _annotate_datetime_columns(data_info: Dict[str, Any], datetime_formats: Dict[str, str]) -> None:
+        """在列信息中标记已在列式副本中解析好的日期列"""
+        for col_info in data_info.get("columns", []):
+            if col_info["name"] in datetime_formats:
+                col_info["datetime_format"] = datetime_formats[col_info["name"]]
+    
+    def profile_dataset(self, dataset) -> Dict[str, Any]:
+        """按数据集的画像模式重新生成列信息"""
+        if dataset.profile_mode == "approximate":
+            return self.analyze_file(
+                dataset.file_path,
+                columnar_path=dataset.columnar_path,
+                encoding=dataset.encoding
+            )
+        return self.analyze_dataframe(self.load_dataset(dataset))
+    
+    async def aprofile_dataset(self, dataset) -> Dict[str, Any]:
+        """异步按数据集的画像模式重新生成列信息"""
+        if dataset.profile_mode == "approximate":
+            return await task_executor.run(
+                analyze_file_task,
+                dataset.file_path,
+                columnar_path=dataset.columnar_path,
+                encoding=dataset.encoding,
+                size_hint=dataset.file_size or 0
+            )
+        df = await self.aload_dataset(dataset)
+        return await task_executor.run(self.analyze_dataframe, df)
+    
+    def get_query_columns(self, query_config: Dict[str, Any], data_info: Dict[str, Any]) -> Optional[List[str]]:
+        """根据查询配置确定需要读取的列，返回None表示读取全部列"""
+        query_type = query_config.get("query_type", "basic")
+        parameters = query_config.get("parameters", {}) or {}
+        available_columns = [col["name"] for col in data_info.get("columns", [])]
+        parsed_columns = {
+            col["name"] for col in data_info.get("columns", [])
+            if col.get("datetime_format")
+        }
+        
+        if query_type == "correlation" and not parameters.get("columns"):
+            # 相关性分析只需要数值列
+            numeric_columns = [
+                col["name"] for col in data_info.get("columns", [])
+                if "int" in col["dtype"] or "float" in col["dtype"]
+            ]
+            return numeric_columns or None
+        
+        column_keys = {
+            "trend": ["time_column", "value_column"],
+            "comparison": ["category_column", "value_column"],
+            "distribution": ["column"],
+            "correlation": ["columns"],
+            "ranking": ["category_column", "value_column"],
+            "proportion": ["category_column", "value_column"] if parameters.get("value_column") else ["category_column"],
+            "stat_summary": ["column"],
+        }.get(query_type)
+        
+        if not column_keys:
+            return None
+        
+        columns = []
+        for key in column_keys:
+            value = parameters.get(key)
+            for column in (value if isinstance(value, list) else [value]):
+                # 参数缺失或列不存在时读取全部列，由后续分析给出错误信息
+                if not column or column not in available_columns:
+                    return None
+                if column not in columns:
+                    columns.append(column)
+        
+        # 趋势分析同时读取入库时解析好的日期列
+        time_column = parameters.get("time_column")
+        if query_type == "trend" and time_column in parsed_columns:
+            columns.append(datetime_column_name(time_column))
+        
+        return columns
+    
+    def analyze_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """分析DataFrame的基本信息"""
+        try:
+            return data_profiler.profile(df)
         
         except Exception as e:
             raise HTTPException(
@@ -138,6 +703,9 @@ class DataProcessor:
         """获取样本数据"""
         try:
             sample_df = df.head(limit)
+            # category 列不能填入新值，先转回文本
+            categorical = sample_df.select_dtypes(include="category").columns
+            sample_df = sample_df.astype({col: object for col in categorical})
             # 处理NaN值
             sample_df = sample_df.fillna("")
             return sample_df.to_dict('records')
@@ -147,8 +715,13 @@ class DataProcessor:
                 detail=f"获取样本数据失败: {str(e)}"
             )
     
-    def query_data(self, df: pd.DataFrame, query_config: Dict[str, Any]) -> Dict[str, Any]:
-        """根据查询配置处理数据"""
+    def query_data(
+        self,
+        df: pd.DataFrame,
+        query_config: Dict[str, Any],
+        memo: Optional[Dict[Any, pd.Series]] = None
+    ) -> Dict[str, Any]:
+        """根据查询配置处理数据，memo 用于在同一份数据的多个查询间共享分组聚合结果"""
         try:
             query_type = query_config.get("query_type", "basic")
             parameters = query_config.get("parameters", {})
@@ -156,9 +729,17 @@ class DataProcessor:
             if query_type == "trend":
                 return self._analyze_trend(df, parameters)
             elif query_type == "comparison":
-                return self._analyze_comparison(df, parameters)
+                return self._analyze_comparison(df, parameters, memo)
             elif query_type == "distribution":
-                return self._analyze_distribution(df, parameters)
+                return self._analyze_distribution(df, parameters, memo)
+            elif query_type == "correlation":
+                return self._analyze_correlation(df, parameters)
+            elif query_type == "ranking":
+                return self._analyze_ranking(df, parameters, memo)
+            elif query_type == "proportion":
+                return self._analyze_proportion(df, parameters, memo)
+            elif query_type == "stat_summary":
+                return self._analyze_stat_summary(df, parameters)
             else:
                 return self._basic_analysis(df, parameters)
         
@@ -168,6 +749,52 @@ class DataProcessor:
                 detail=f"数据查询失败: {str(e)}"
             )
     
+    def query_batch(self, df: pd.DataFrame, query_configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """对同一份数据执行多个查询，相同的分组聚合只计算一次；单个查询失败时结果为 {"error": 原因}"""
+        memo: Dict[Any, pd.Series] = {}
+        results = []
+        for query_config in query_configs:
+            try:
+                results.append(self.query_data(df, query_config, memo))
+            except HTTPException as e:
+                results.append({"error": e.detail})
+        return results
+    
+    def _group_totals(
+        self,
+        df: pd.DataFrame,
+        category_col: str,
+        value_col: str,
+        memo: Optional[Dict[Any, pd.Series]] = None
+    ) -> pd.Series:
+        """按分类对数值列求和"""
+        key = ("sum", category_col, value_col)
+        if memo is not None and key in memo:
+            return memo[key]
+        totals = df.groupby(category_col, sort=False, observed=True)[value_col].sum()
+        if memo is not None:
+            memo[key] = totals
+        return totals
+    
+    def _value_counts(
+        self,
+        df: pd.DataFrame,
+        column: str,
+        memo: Optional[Dict[Any, pd.Series]] = None
+    ) -> pd.Series:
+        """统计各取值出现的次数，按首次出现的顺序排列
+
+        category 列的 value_counts 按类别顺序排列并包含计数为0的类别，
+        统一用 groupby 统计，结果与文本列一致。
+        """
+        key = ("count", column)
+        if memo is not None and key in memo:
+            return memo[key]
+        counts = df.groupby(column, sort=False, observed=True).size()
+        if memo is not None:
+            memo[key] = counts
+        return counts
+    
     def _analyze_trend(self, df: pd.DataFrame, config: Dict) -> Dict[str, Any]:
         """趋势分析"""
         time_col = config.get("time_column")
@@ -176,17 +803,67 @@ class DataProcessor:
         if not time_col or not value_col:
             raise ValueError("趋势分析需要指定时间列和数值列")
         
-        # 按时间排序并聚合
-        trend_data = df.groupby(time_col)[value_col].sum().reset_index()
+        granularity = config.get("granularity")
+        if granularity:
+            # 粒度来自模型输出，无法识别时按原始时间点绘制
+            key = granularity.strip().lower() if isinstance(granularity, str) else None
+            if key not in GRANULARITY_FREQUENCIES:
+                print(f"Invalid granularity hint ignored: {granularity!r}")
+            granularity = key if key in GRANULARITY_FREQUENCIES else None
         
-        return {
+        result = {
             "chart_type": "line",
-            "data": trend_data.to_dict('records'),
             "x_axis": time_col,
             "y_axis": value_col
         }
+        
+        times = resolve_datetime_values(df, time_col)
+        if times is None:
+            # 无法解析为日期时按原始值分组
+            trend_data = df.groupby(time_col, observed=True)[value_col].sum().reset_index()
+            x_col = time_col
+        elif granularity:
+            # 按时间粒度向量化重采样，没有数据的时间桶计为0；
+            # 时间桶统一左闭并以起点标注，周从周一开始、以当周周一为标签
+            values = pd.Series(df[value_col].to_numpy(), index=pd.DatetimeIndex(times))
+            bucketed = values[values.index.notna()].resample(
+                GRANULARITY_FREQUENCIES[granularity], closed="left", label="left"
+            ).sum()
+            trend_data = pd.DataFrame({
+                "_time": bucketed.index,
+                time_col: format_bucket_labels(bucketed.index, granularity),
+                value_col: bucketed.to_numpy()
+            })
+            x_col = "_time"
+            result["granularity"] = granularity
+        else:
+            # 按解析后的日期排序分组，横轴保留原始写法
+            frame = pd.DataFrame({
+                "_time": times.to_numpy(),
+                time_col: df[time_col].to_numpy(),
+                value_col: df[value_col].to_numpy()
+            }).dropna(subset=["_time"])
+            trend_data = frame.groupby("_time", sort=True).agg(**{
+                time_col: (time_col, "first"),
+                value_col: (value_col, "sum")
+            }).reset_index()
+            if pd.api.types.is_datetime64_any_dtype(trend_data[time_col]):
+                trend_data[time_col] = trend_data[time_col].astype(str)
+            x_col = "_time"
+        
+        # 数据点过多时降采样，保留曲线形状
+        if len(trend_data) > settings.TREND_MAX_POINTS:
+            result["downsampled"] = {
+                "method": "lttb",
+                "original_points": len(trend_data),
+                "points": settings.TREND_MAX_POINTS
+            }
+            trend_data = downsample_series(trend_data, x_col, value_col, settings.TREND_MAX_POINTS)
+        
+        result["data"] = trend_data[[time_col, value_col]].to_dict('records')
+        return result
     
-    def _analyze_comparison(self, df: pd.DataFrame, config: Dict) -> Dict[str, Any]:
+    def _analyze_comparison(self, df: pd.DataFrame, config: Dict, memo: Optional[Dict] = None) -> Dict[str, Any]:
         """对比分析"""
         category_col = config.get("category_column")
         value_col = config.get("value_column")
@@ -194,17 +871,23 @@ class DataProcessor:
         if not category_col or not value_col:
             raise ValueError("对比分析需要指定分类列和数值列")
         
-        # 按分类聚合
-        comparison_data = df.groupby(category_col)[value_col].sum().reset_index()
+        # 按分类聚合，分组过多时只保留前K个，其余合并为“其他”
+        totals = self._group_totals(df, category_col, value_col, memo)
+        top_k = self._resolve_top_k(config)
+        comparison_data = self._top_k_frame(totals.sort_index() if len(totals) <= top_k else totals, top_k)
+        comparison_data.columns = [category_col, value_col]
         
-        return {
+        result = {
             "chart_type": "bar",
             "data": comparison_data.to_dict('records'),
             "x_axis": category_col,
             "y_axis": value_col
         }
+        if len(totals) > top_k:
+            result["top_k"] = {"k": top_k, "total_groups": len(totals)}
+        return result
     
-    def _analyze_distribution(self, df: pd.DataFrame, config: Dict) -> Dict[str, Any]:
+    def _analyze_distribution(self, df: pd.DataFrame, config: Dict, memo: Optional[Dict] = None) -> Dict[str, Any]:
         """分布分析"""
         column = config.get("column")
         
@@ -212,28 +895,215 @@ class DataProcessor:
             raise ValueError("分布分析需要指定列名")
         
         # 计算分布
-        if pd.api.types.is_numeric_dtype(df[column]):
-            # 数值型：直方图
-            hist_data = df[column].value_counts().sort_index().reset_index()
-            hist_data.columns = [column, 'count']
+        if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column]):
+            # 数值型：服务端分箱的直方图，数据点数不超过 HISTOGRAM_MAX_BINS
+            hist = histogram(df[column], settings.HISTOGRAM_MAX_BINS, bins=config.get("bins"))
+            edges, counts = hist["edges"], hist["counts"]
+            hist_data = [
+                {
+                    column: f"{edges[i]:.4g} - {edges[i + 1]:.4g}",
+                    "bin_start": edges[i],
+                    "bin_end": edges[i + 1],
+                    "count": counts[i]
+                }
+                for i in range(len(counts))
+            ]
             
             return {
                 "chart_type": "histogram",
-                "data": hist_data.to_dict('records'),
+                "data": hist_data,
+                "bins": hist,
                 "x_axis": column,
                 "y_axis": "count"
             }
         else:
-            # 分类型：饼图
-            pie_data = df[column].value_counts().reset_index()
+            # 分类型：饼图，类别过多时只保留前K个，其余合并为“其他”
+            counts = self._value_counts(df, column, memo)
+            top_k = self._resolve_top_k(config)
+            pie_data = self._top_k_frame(counts.nlargest(len(counts)) if len(counts) <= top_k else counts, top_k)
             pie_data.columns = [column, 'count']
             
-            return {
+            result = {
                 "chart_type": "pie",
                 "data": pie_data.to_dict('records'),
                 "name_field": column,
                 "value_field": "count"
             }
+            if len(counts) > top_k:
+                result["top_k"] = {"k": top_k, "total_groups": len(counts)}
+            return result
+    
+    def _resolve_top_k(self, config: Dict) -> int:
+        """分组数上限，参数 top_k 可覆盖默认值，无法解析时使用默认值"""
+        top_k = config.get("top_k") or settings.CATEGORY_TOP_K
+        try:
+            top_k = int(top_k)
+        except (TypeError, ValueError, OverflowError):
+            print(f"Invalid top_k hint ignored: {top_k!r}")
+            top_k = settings.CATEGORY_TOP_K
+        return max(1, min(top_k, settings.CATEGORY_MAX_TOP_K))
+    
+    def _top_k_frame(self, totals: pd.Series, top_k: int) -> pd.DataFrame:
+        """取前K个分组并合并长尾，返回两列的DataFrame"""
+        return top_k_with_other(totals, top_k).reset_index()
+    
+    @staticmethod
+    def _numeric_columns(df: pd.DataFrame, columns: Optional[List] = None) -> List:
+        """数值列（不含布尔列），指定 columns 时只保留其中存在的数值列"""
+        candidates = df.columns if columns is None else columns
+        return [
+            col for col in candidates
+            if isinstance(col, Hashable) and col in df.columns
+            and pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+        ]
+    
+    def _analyze_correlation(self, df: pd.DataFrame, config: Dict) -> Dict[str, Any]:
+        """相关性分析"""
+        requested = config.get("columns")
+        columns = self._numeric_columns(df, requested) if isinstance(requested, list) else []
+        if requested and columns != requested:
+            # 列名来自模型输出，只保留存在的数值列；不足两个时改用全部数值列
+            print(f"Invalid correlation columns ignored: {requested!r}")
+        if len(columns) < 2:
+            columns = self._numeric_columns(df)
+        columns = columns[:settings.CORRELATION_MAX_COLUMNS]
+        
+        if len(columns) < 2:
+            # 数值列不足时无法计算相关矩阵，退回基础分析
+            return self._basic_analysis(df, {})
+        
+        values = df[columns].to_numpy(dtype="float64", na_value=np.nan)
+        if np.isnan(values).any():
+            # 有缺失值时按列对使用成对的非空行计算
+            matrix = df[columns].corr().to_numpy()
+        else:
+            # 无缺失值时一次求出整个相关矩阵
+            with np.errstate(all="ignore"):
+                matrix = np.corrcoef(values, rowvar=False)
+        
+        matrix = [[None if np.isnan(r) else round(float(r), 4) for r in row] for row in matrix]
+        heatmap_data = [
+            {"x": columns[i], "y": columns[j], "value": matrix[i][j]}
+            for i in range(len(columns))
+            for j in range(len(columns))
+        ]
+        
+        return {
+            "chart_type": "heatmap",
+            "data": heatmap_data,
+            "columns": columns,
+            "matrix": matrix,
+            "x_axis": "x",
+            "y_axis": "y",
+            "value_field": "value"
+        }
+    
+    def _analyze_ranking(self, df: pd.DataFrame, config: Dict, memo: Optional[Dict] = None) -> Dict[str, Any]:
+        """排名分析"""
+        category_col = config.get("category_column")
+        value_col = config.get("value_column")
+        
+        if not value_col:
+            raise ValueError("排名分析需要指定数值列")
+        
+        top_k = self._resolve_top_k(config)
+        ascending = config.get("order") == "asc"
+        
+        if category_col:
+            # 先按分类聚合再部分排序
+            totals = self._group_totals(df, category_col, value_col, memo)
+            ranked = totals.nsmallest(top_k) if ascending else totals.nlargest(top_k)
+            ranking_data = ranked.reset_index()
+            ranking_data.columns = [category_col, value_col]
+            label_col = category_col
+        else:
+            # 没有分类列时对行排序，用第一个非数值列作为标签
+            ranked = df.nsmallest(top_k, value_col) if ascending else df.nlargest(top_k, value_col)
+            labels = [col for col in df.columns if col != value_col and not pd.api.types.is_numeric_dtype(df[col])]
+            label_col = labels[0] if labels else "rank"
+            ranking_data = pd.DataFrame({
+                label_col: ranked[label_col].to_numpy() if labels else np.arange(1, len(ranked) + 1),
+                value_col: ranked[value_col].to_numpy()
+            })
+        
+        return {
+            "chart_type": "bar",
+            "data": ranking_data.to_dict('records'),
+            "x_axis": label_col,
+            "y_axis": value_col,
+            "order": "asc" if ascending else "desc"
+        }
+    
+    def _analyze_proportion(self, df: pd.DataFrame, config: Dict, memo: Optional[Dict] = None) -> Dict[str, Any]:
+        """占比分析"""
+        column = config.get("category_column") or config.get("column")
+        value_col = config.get("value_column")
+        
+        if not column:
+            raise ValueError("占比分析需要指定分类列")
+        
+        if value_col:
+            # 各分类数值之和占总和的比例
+            totals = self._group_totals(df, column, value_col, memo)
+            shares = totals / totals.sum()
+        else:
+            # 各分类出现次数的比例
+            counts = self._value_counts(df, column, memo)
+            shares = counts / counts.sum()
+        
+        top_k = self._resolve_top_k(config)
+        proportion_data = self._top_k_frame(shares.nlargest(len(shares)) if len(shares) <= top_k else shares, top_k)
+        proportion_data.columns = [column, 'proportion']
+        proportion_data['proportion'] = proportion_data['proportion'].round(6)
+        
+        result = {
+            "chart_type": "pie",
+            "data": proportion_data.to_dict('records'),
+            "name_field": column,
+            "value_field": "proportion"
+        }
+        if len(shares) > top_k:
+            result["top_k"] = {"k": top_k, "total_groups": len(shares)}
+        return result
+    
+    def _analyze_stat_summary(self, df: pd.DataFrame, config: Dict) -> Dict[str, Any]:
+        """统计摘要"""
+        column = config.get("column") or config.get("value_column")
+        if column:
+            columns = [column]
+        else:
+            columns = self._numeric_columns(df)[:settings.CORRELATION_MAX_COLUMNS]
+        
+        # 布尔列无法计算分位数，与非数值列一样拒绝
+        if not columns or self._numeric_columns(df, columns) != columns:
+            raise ValueError("统计摘要需要指定数值列")
+        
+        # 一次求出所有列的分位数
+        numeric = df[columns]
+        quantiles = numeric.quantile([0, 0.25, 0.5, 0.75, 1])
+        means = numeric.mean()
+        stds = numeric.std()
+        counts = numeric.count()
+        
+        summary_data = []
+        for col in columns:
+            q = quantiles[col]
+            stats = {
+                "min": q[0], "q1": q[0.25], "median": q[0.5], "q3": q[0.75], "max": q[1],
+                "mean": means[col], "std": stds[col]
+            }
+            summary_data.append({
+                "column": col,
+                **{key: None if pd.isna(value) else float(value) for key, value in stats.items()},
+                "count": int(counts[col])
+            })
+        
+        return {
+            "chart_type": "boxplot",
+            "data": summary_data,
+            "summary": True,
+            "category_column": "column"
+        }
     
     def _basic_analysis(self, df: pd.DataFrame, config: Dict) -> Dict[str, Any]:
         """基础分析"""
@@ -268,7 +1138,7 @@ class DataProcessor:
         else:
             # 没有数值列，返回第一列的分布
             first_col = df.columns[0]
-            dist_data = df[first_col].value_counts().head(10).reset_index()
+            dist_data = self._value_counts(df, first_col).sort_values(ascending=False).head(10).reset_index()
             dist_data.columns = [first_col, 'count']
             
             return {
@@ -280,4 +1150,31 @@ class DataProcessor:
 
 
 # 全局数据处理器实例
-data_processor = DataProcessor() 
\ No newline at end of file
+data_processor = DataProcessor()
+
+
+# 以下模块级函数可被进程池序列化调用，在子进程中使用子进程自己的 data_processor
+@process_task
+def load_data_task(
+    file_path: str,
+    columns: Optional[List[str]] = None,
+    columnar_path: Optional[str] = None,
+    encoding: Optional[str] = None,
+    dtype_schema: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    return data_processor.load_data(
+        file_path,
+        columns=columns,
+        columnar_path=columnar_path,
+        encoding=encoding,
+        dtype_schema=dtype_schema
+    )
+
+
+@process_task
+def analyze_file_task(
+    file_path: str,
+    columnar_path: Optional[str] = None,
+    encoding: Optional[str] = None
+) -> Dict[str, Any]:
+    return data_processor.analyze_file(file_path, columnar_path=columnar_path, encoding=encoding) 
\ No newline at end of file
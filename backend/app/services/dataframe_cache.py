@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+
+class DataFrameCache:
+    """进程内DataFrame缓存，按内存预算做LRU淘汰
+
+    缓存键为 (数据集ID, 列集合)，每个条目同时记录源文件的 (mtime, size) 指纹，
+    文件变化后旧条目自动失效。返回的DataFrame为共享对象，调用方不应原地修改。
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[Tuple, pd.DataFrame, int]]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _make_key(dataset_id: int, columns: Optional[List[str]]) -> Tuple:
+        return (dataset_id, tuple(columns) if columns else None)
+
+    def get(self, dataset_id: int, columns: Optional[List[str]], fingerprint: Tuple) -> Optional[pd.DataFrame]:
+        """获取缓存的DataFrame，列投影查询可由全量缓存条目直接提供"""
+        with self._lock:
+            for key in (self._make_key(dataset_id, columns), self._make_key(dataset_id, None)):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if columns and key[1] is None and not set(columns).issubset(entry[1].columns):
+                    # 全量条目不含所需的列（如解析后的日期列），需单独读取
+                    continue
+                if entry[0] != fingerprint:
+                    # 源文件已变化，丢弃旧条目
+                    self._remove(key)
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                df = entry[1]
+                if columns and key[1] is None:
+                    return df[list(columns)]
+                return df
+
+            self.misses += 1
+            return None
+
+    def put(self, dataset_id: int, columns: Optional[List[str]], fingerprint: Tuple, df: pd.DataFrame) -> None:
+        """写入缓存，超出预算时淘汰最久未使用的条目"""
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+
+        key = self._make_key(dataset_id, columns)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            while self._entries and self._current_bytes + nbytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+            self._entries[key] = (fingerprint, df, nbytes)
+            self._current_bytes += nbytes
+
+    def invalidate(self, dataset_id: int) -> None:
+        """移除某个数据集的全部缓存条目"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dataset_id]:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def _remove(self, key: Tuple) -> None:
+        _, _, nbytes = self._entries.pop(key)
+        self._current_bytes -= nbytes
@@ -0,0 +1,115 @@
+from typing import Dict, Optional
+
+import pandas as pd
+
+# 列式副本中解析后日期列的列名前缀，加载数据时对外隐藏
+DATETIME_COLUMN_PREFIX = "__dt__"
+
+# 候选日期格式，按顺序尝试；ISO8601 覆盖 2024-01-05、2024-01-05T08:00:00 等写法
+DATETIME_FORMATS = [
+    "ISO8601",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%Y/%m/%d",
+    "%Y/%m",
+    "%Y年%m月%d日 %H:%M:%S",
+    "%Y年%m月%d日 %H:%M",
+    "%Y年%m月%d日",
+    "%Y年%m月",
+    "%Y年",
+    "%Y.%m.%d",
+    "%Y%m%d",
+]
+
+# 时间粒度到重采样频率的映射
+GRANULARITY_FREQUENCIES = {
+    "hour": "H",
+    "day": "D",
+    "week": "W-MON",  # 配合 closed="left"、label="left"，即周一开始的自然周
+    "month": "MS",
+    "quarter": "QS",
+    "year": "YS",
+}
+
+DETECT_SAMPLE_SIZE = 200  # 检测格式时采样的非空值个数
+DETECT_MIN_RATIO = 0.95  # 样本中能解析的比例达到该值才认为是日期列
+
+
+def datetime_column_name(column: str) -> str:
+    """解析后日期列的列名"""
+    return f"{DATETIME_COLUMN_PREFIX}{column}"
+
+
+def is_datetime_column_name(name) -> bool:
+    """是否为解析后日期列"""
+    return isinstance(name, str) and name.startswith(DATETIME_COLUMN_PREFIX)
+
+
+def detect_datetime_format(series: pd.Series) -> Optional[str]:
+    """对文本列采样，返回能解析绝大多数样本的日期格式"""
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return None
+
+    sample = series.dropna().head(DETECT_SAMPLE_SIZE)
+    if sample.empty or not all(isinstance(value, str) for value in sample):
+        return None
+
+    for fmt in DATETIME_FORMATS:
+        parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+        if parsed.notna().mean() >= DETECT_MIN_RATIO:
+            return fmt
+
+    return None
+
+
+def detect_datetime_formats(df: pd.DataFrame) -> Dict[str, str]:
+    """检测DataFrame中可解析为日期的文本列，返回 {列名: 格式}"""
+    formats = {}
+    for column in df.columns:
+        fmt = detect_datetime_format(df[column])
+        if fmt:
+            formats[column] = fmt
+    return formats
+
+
+def parse_datetime(series: pd.Series, fmt: str) -> pd.Series:
+    """按已检测的格式向量化解析整列，无法解析的值为 NaT"""
+    return pd.to_datetime(series, format=fmt, errors="coerce")
+
+
+def add_datetime_columns(df: pd.DataFrame, formats: Dict[str, str]) -> pd.DataFrame:
+    """返回附加了解析后日期列的新DataFrame，用于写入列式副本"""
+    if not formats:
+        return df
+    return df.assign(**{
+        datetime_column_name(column): parse_datetime(df[column], fmt)
+        for column, fmt in formats.items()
+    })
+
+
+def resolve_datetime_values(df: pd.DataFrame, column: str) -> Optional[pd.Series]:
+    """获取列的日期值：优先使用入库时解析好的列，其次是日期类型的原始列，最后现场检测解析"""
+    parsed_column = datetime_column_name(column)
+    if parsed_column in df.columns:
+        return df[parsed_column]
+
+    series = df[column]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    fmt = detect_datetime_format(series)
+    return parse_datetime(series, fmt) if fmt else None
+
+
+def format_bucket_labels(buckets: pd.DatetimeIndex, granularity: str) -> pd.Index:
+    """时间桶的显示标签"""
+    if granularity == "quarter":
+        return pd.Index([f"{ts.year}年Q{ts.quarter}" for ts in buckets])
+    label_formats = {
+        "hour": "%Y-%m-%d %H:00",
+        "day": "%Y-%m-%d",
+        "week": "%Y-%m-%d",
+        "month": "%Y-%m",
+        "year": "%Y",
+    }
+    return buckets.strftime(label_formats[granularity])
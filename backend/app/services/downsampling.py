@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 降采样，返回保留点的下标
+
+    首尾两点始终保留；中间的点均分为 threshold - 2 个桶，每个桶选出与
+    上一个已选点、下一个桶均值点构成三角形面积最大的点，保留曲线的峰谷形状。
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 桶边界：第一个和最后一个点单独成桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # 下一个桶的均值点，最后一个桶的下一个点就是终点
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        mean_x = x[next_start:next_end].mean()
+        mean_y = y[next_start:next_end].mean()
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[previous] - mean_x) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (mean_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return selected
+
+
+def downsample_series(df: pd.DataFrame, x_col: str, y_col: str, target_points: int) -> pd.DataFrame:
+    """按 LTTB 对折线数据降采样，数据点不超过 target_points 时原样返回
+
+    df 需已按 x_col 排序；x_col 为数值或时间类型时按实际间距计算，否则按序号计算。
+    """
+    if len(df) <= target_points:
+        return df
+
+    x_values = df[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x = x_values.astype("int64").to_numpy(dtype="float64")
+    elif pd.api.types.is_numeric_dtype(x_values):
+        x = x_values.to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        x = np.arange(len(df), dtype="float64")
+
+    y = df[y_col].to_numpy(dtype="float64", na_value=np.nan)
+    # 缺失值不参与面积计算
+    y = np.where(np.isnan(y), 0.0, y)
+    if np.isnan(x).any():
+        x = np.arange(len(df), dtype="float64")
+
+    return df.iloc[lttb_indices(x, y, target_points)]
@@ -0,0 +1,83 @@
+from typing import Any, Collection, Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 整数列按从小到大的顺序尝试
+INTEGER_DTYPES = ("int8", "int16", "int32")
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    """DataFrame 占用的内存字节数，包含字符串对象本身"""
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def _smallest_integer_dtype(low: Any, high: Any) -> str:
+    """能容纳 [low, high] 的最小整数类型"""
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return "int64"
+
+
+def plan_dtypes(
+    data_info: Dict[str, Any],
+    max_unique_ratio: float,
+    max_unique: int,
+    exclude: Collection[str] = ()
+) -> Dict[str, str]:
+    """根据列画像选择更紧凑的类型，返回 {列名: 目标类型}，只包含需要转换的列
+
+    整数列按取值范围缩小位宽；唯一值少的文本列转为 category，exclude 中的列不转换。
+    浮点列保持 float64，降为 float32 会改变求和与均值的结果。
+    """
+    row_count = data_info.get("row_count") or 0
+    schema = {}
+    for col in data_info.get("columns", []):
+        dtype = col.get("dtype")
+        if dtype in ("int16", "int32", "int64") and col.get("min") is not None:
+            target = _smallest_integer_dtype(col["min"], col["max"])
+            if np.dtype(target).itemsize < np.dtype(dtype).itemsize:
+                schema[col["name"]] = target
+        elif dtype == "object" and col["name"] not in exclude:
+            unique_count = col.get("unique_count", row_count)
+            if unique_count <= max_unique and unique_count <= row_count * max_unique_ratio:
+                schema[col["name"]] = "category"
+    return schema
+
+
+def apply_dtypes(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """按类型方案转换列，返回新的 DataFrame
+
+    只做无损转换：整数列确认取值落在目标类型范围内，文本列确认全部是字符串；
+    已是目标类型或不满足条件的列保持不变。
+    """
+    converted = {}
+    for column, target in schema.items():
+        if column not in df.columns or str(df[column].dtype) == target:
+            continue
+        series = df[column]
+        if target == "category":
+            if pd.api.types.is_object_dtype(series) and pd.api.types.infer_dtype(series, skipna=True) == "string":
+                converted[column] = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            info = np.iinfo(target)
+            if series.empty or (info.min <= series.min() and series.max() <= info.max):
+                converted[column] = series.astype(target)
+
+    if not converted:
+        return df
+    df = df.copy(deep=False)
+    for column, series in converted.items():
+        df[column] = series
+    return df
+
+
+def measure_dtypes(chunks: Iterable[pd.DataFrame], schema: Dict[str, str]) -> Tuple[int, int]:
+    """逐块统计转换前后的内存字节数，返回 (转换前, 转换后)"""
+    before = after = 0
+    for chunk in chunks:
+        before += memory_bytes(chunk)
+        after += memory_bytes(apply_dtypes(chunk, schema))
+    return before, after
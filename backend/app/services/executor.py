@@ -0,0 +1,81 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+class TaskError(Exception):
+    """可跨进程传递的任务错误，HTTPException 无法被 pickle"""
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def process_task(func: Callable) -> Callable:
+    """标记可在进程池中运行的模块级任务函数，把 HTTPException 转为可序列化的错误"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except HTTPException as e:
+            raise TaskError(e.status_code, e.detail)
+    return wrapper
+
+
+class TaskExecutor:
+    """CPU密集任务执行层
+
+    pandas 解析、画像、查询等同步计算不在事件循环中执行：
+    数据量超过 PROCESS_POOL_THRESHOLD 的任务交给进程池，避免占用主进程的 GIL；
+    其余任务交给线程池。进程池中运行的函数必须是用 process_task 包装的模块级函数。
+    """
+
+    def __init__(self):
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=settings.THREAD_POOL_SIZE,
+            thread_name_prefix="data-worker"
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        # 延迟创建；使用 spawn 避免 fork 继承事件循环和连接池状态
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=settings.PROCESS_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
+
+    async def run(self, func: Callable, *args, size_hint: int = 0, **kwargs) -> Any:
+        """在线程池或进程池中执行 func 并等待结果
+
+        size_hint 为待处理数据的字节数，未给出时始终使用线程池。
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+
+        if size_hint > 0 and size_hint >= settings.PROCESS_POOL_THRESHOLD and settings.PROCESS_POOL_SIZE > 0:
+            try:
+                return await loop.run_in_executor(self._get_process_pool(), call)
+            except TaskError as e:
+                raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+        return await loop.run_in_executor(self._thread_pool, call)
+
+    def shutdown(self) -> None:
+        """关闭线程池和进程池"""
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+
+# 全局任务执行器实例
+task_executor = TaskExecutor()
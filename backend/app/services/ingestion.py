@@ -0,0 +1,103 @@
+import asyncio
+from typing import Set
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.dataset import Dataset
+from app.models.ingestion_job import IngestionJob
+from app.services.data_processor import data_processor
+from app.services.executor import task_executor
+
+
+def run_ingestion_job(job_id: int) -> None:
+    """执行入库任务：解析、画像、写入列式副本并创建数据集记录
+
+    在 Celery worker、线程池或进程池中运行，使用同步数据库会话，
+    任务状态和进度直接写回 ingestion_jobs 表。
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(IngestionJob, job_id)
+        if job is None:
+            return
+
+        def report(stage: str, progress: int) -> None:
+            job.status = "running"
+            job.stage = stage
+            job.progress = progress
+            db.commit()
+
+        report("parsing", 5)
+        data_info, columnar_path, dtype_info = data_processor.ingest_file(
+            job.file_path,
+            encoding=job.encoding,
+            profile_mode=job.profile_mode,
+            progress=report
+        )
+
+        # 创建数据集记录
+        dataset = Dataset(
+            name=job.file_name,
+            file_path=job.file_path,
+            file_type=job.file_type,
+            file_size=job.file_size,
+            content_hash=job.content_hash,
+            encoding=job.encoding,
+            columnar_path=columnar_path,
+            columns_info=data_info,
+            row_count=data_info["row_count"],
+            profile_mode=job.profile_mode,
+            **dtype_info
+        )
+        db.add(dataset)
+        db.flush()
+
+        job.dataset_id = dataset.id
+        job.status = "succeeded"
+        job.stage = "done"
+        job.progress = 100
+        db.commit()
+
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        print(f"Ingestion job {job_id} error: {error}")
+        db.rollback()
+        job = db.get(IngestionJob, job_id)
+        if job is not None:
+            job.status = "failed"
+            job.error = error
+            db.commit()
+
+    finally:
+        db.close()
+
+
+class IngestionQueue:
+    """入库任务队列
+
+    配置了 CELERY_BROKER_URL 时把任务投递给 Celery worker；
+    否则在本进程的任务执行器中运行，大文件交给进程池。
+    """
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, job_id: int, size_hint: int = 0) -> None:
+        """提交入库任务，不等待执行完成"""
+        if settings.CELERY_BROKER_URL:
+            from app.worker import ingest_dataset
+            await task_executor.run(ingest_dataset.delay, job_id)
+            return
+
+        task = asyncio.create_task(
+            task_executor.run(run_ingestion_job, job_id, size_hint=size_hint)
+        )
+        # 保留引用，避免任务在完成前被回收
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+# 全局入库任务队列实例
+ingestion_queue = IngestionQueue()
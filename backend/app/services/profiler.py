@@ -0,0 +1,216 @@
+from typing import Dict, Any, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.sketches import HyperLogLog, MomentsAccumulator, ReservoirSampler, hash_values
+
+
+class DataProfiler:
+    """数据画像生成器
+
+    对整个DataFrame做批量统计，输出结构与逐列计算的 columns_info 完全一致：
+    - 数值列拼成一个列主序的二维数组，按列块一次求出空值数和 min/max/mean/std；
+    - 非数值列用一次 factorize 同时得到空值数和唯一值数；
+    - 样本值优先从头部窗口中选取，避免对每列做 dropna。
+    """
+
+    SAMPLE_SIZE = 5
+    SAMPLE_WINDOW = 64  # 样本值优先从前若干行中选取
+    BLOCK_ELEMENTS = 256 * 1024  # 每次归约处理的元素数，保证块能放进CPU缓存
+
+    def profile(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """生成数据集的列信息"""
+        dtypes = list(df.dtypes)
+        numeric_positions = [
+            i for i, dtype in enumerate(dtypes)
+            if pd.api.types.is_numeric_dtype(dtype)
+        ]
+        numeric_set = set(numeric_positions)
+
+        numeric_stats, numeric_nulls = self._numeric_stats(df, numeric_positions)
+        sample_values = self._sample_values(df)
+
+        info = {
+            "row_count": len(df),
+            "column_count": len(df.columns),
+            "columns": []
+        }
+
+        for i, col in enumerate(df.columns):
+            series = df.iloc[:, i]
+            if i in numeric_set:
+                null_count = numeric_nulls[i]
+                unique_count = series.nunique()
+            else:
+                # 一次哈希同时得到空值数和唯一值数
+                codes, uniques = pd.factorize(series)
+                null_count = np.count_nonzero(codes == -1)
+                unique_count = len(uniques)
+
+            col_info = {
+                "name": col,
+                "dtype": str(dtypes[i]),
+                "null_count": int(null_count),
+                "unique_count": int(unique_count),
+                "sample_values": sample_values[i]
+            }
+
+            if i in numeric_set:
+                col_info.update(numeric_stats[i])
+
+            info["columns"].append(col_info)
+
+        return info
+
+    def _numeric_stats(self, df: pd.DataFrame, positions: List[int]) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, int]]:
+        """一次计算所有数值列的空值数和 min/max/mean/std"""
+        if not positions:
+            return {}, {}
+
+        # 列主序存储，按列归约时访问连续内存，求和方式与 pandas 逐列计算一致
+        values = np.asfortranarray(
+            df.iloc[:, positions].to_numpy(dtype="float64", na_value=np.nan)
+        )
+        block_size = max(1, self.BLOCK_ELEMENTS // max(len(df), 1))
+
+        stats = {}
+        nulls = {}
+        for start in range(0, len(positions), block_size):
+            block = values[:, start:start + block_size]
+            null_counts, mins, maxs, means, stds = self._reduce_block(block)
+            for j in range(block.shape[1]):
+                position = positions[start + j]
+                nulls[position] = int(null_counts[j])
+                stats[position] = {
+                    "min": self._to_float(mins[j]),
+                    "max": self._to_float(maxs[j]),
+                    "mean": self._to_float(means[j]),
+                    "std": self._to_float(stds[j])
+                }
+
+        return stats, nulls
+
+    @staticmethod
+    def _reduce_block(block: np.ndarray):
+        """对一个列块做掩码归约，与 pandas nanops 的计算顺序保持一致"""
+        mask = np.isnan(block)
+        null_counts = np.count_nonzero(mask, axis=0)
+        counts = block.shape[0] - null_counts
+
+        with np.errstate(all="ignore"):
+            means = np.where(mask, 0.0, block).sum(axis=0) / counts
+            mins = np.where(mask, np.inf, block).min(axis=0, initial=np.inf)
+            maxs = np.where(mask, -np.inf, block).max(axis=0, initial=-np.inf)
+            deviations = np.where(mask, 0.0, means - block)
+            variances = (deviations * deviations).sum(axis=0) / (counts - 1)
+
+        empty = counts == 0
+        mins[empty] = np.nan
+        maxs[empty] = np.nan
+        stds = np.where(counts > 1, np.sqrt(variances), np.nan)
+
+        return null_counts, mins, maxs, means, stds
+
+    def _sample_values(self, df: pd.DataFrame) -> List[List[Any]]:
+        """每列取前几个非空值，只有头部窗口不足时才扫描整列"""
+        head = df.head(self.SAMPLE_WINDOW)
+        head_notna = head.notna().to_numpy()
+        window_covers_all = len(head) == len(df)
+
+        samples = []
+        for i in range(len(df.columns)):
+            mask = head_notna[:, i]
+            if window_covers_all or mask.sum() >= self.SAMPLE_SIZE:
+                series = head.iloc[:, i][mask]
+            else:
+                series = df.iloc[:, i].dropna()
+            samples.append(series.head(self.SAMPLE_SIZE).tolist())
+
+        return samples
+
+    def profile_chunks(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """分块流式生成近似画像，内存占用与数据总行数无关
+
+        唯一值数由 HyperLogLog 估计，样本值来自蓄水池抽样，这两个字段
+        记录在每列的 estimated_fields 中；空值数、min/max/mean/std 为精确值。
+        """
+        row_count = 0
+        sketches: Dict[Any, _ColumnSketch] = {}
+
+        for chunk in chunks:
+            row_count += len(chunk)
+            for i, col in enumerate(chunk.columns):
+                sketch = sketches.get(col)
+                if sketch is None:
+                    sketch = sketches[col] = _ColumnSketch(col, self.SAMPLE_SIZE)
+                sketch.update(chunk.iloc[:, i])
+
+        return {
+            "row_count": row_count,
+            "column_count": len(sketches),
+            "columns": [sketch.to_info() for sketch in sketches.values()],
+            "profile_mode": "approximate"
+        }
+
+    @staticmethod
+    def _to_float(value: float):
+        return None if np.isnan(value) else float(value)
+
+
+class _ColumnSketch:
+    """单列的可合并统计草图"""
+
+    def __init__(self, name: Any, sample_size: int):
+        self.name = name
+        self.dtype = None
+        self.is_numeric = True
+        self.null_count = 0
+        self.distinct = HyperLogLog()
+        self.moments = MomentsAccumulator()
+        self.reservoir = ReservoirSampler(sample_size)
+
+    def update(self, series: pd.Series) -> None:
+        self._merge_dtype(series.dtype)
+
+        non_null = series.dropna()
+        self.null_count += len(series) - len(non_null)
+        self.distinct.update(hash_values(non_null))
+        self.reservoir.update(non_null)
+
+        if self.is_numeric:
+            self.moments.update(non_null.to_numpy(dtype="float64"))
+
+    def _merge_dtype(self, dtype) -> None:
+        """CSV分块推断的类型可能不一致，取能容纳各块的公共类型"""
+        self.is_numeric = self.is_numeric and pd.api.types.is_numeric_dtype(dtype)
+        if self.dtype is None or self.dtype == dtype:
+            self.dtype = dtype
+        elif isinstance(self.dtype, np.dtype) and isinstance(dtype, np.dtype) and self.is_numeric:
+            self.dtype = np.result_type(self.dtype, dtype)
+        else:
+            self.dtype = np.dtype("object")
+
+    def to_info(self) -> Dict[str, Any]:
+        col_info = {
+            "name": self.name,
+            "dtype": str(self.dtype),
+            "null_count": int(self.null_count),
+            "unique_count": self.distinct.count(),
+            "sample_values": self.reservoir.samples,
+            "estimated_fields": ["unique_count", "sample_values"]
+        }
+
+        if self.is_numeric:
+            col_info.update({
+                "min": self.moments.min,
+                "max": self.moments.max,
+                "mean": self.moments.mean if self.moments.count else None,
+                "std": self.moments.std
+            })
+
+        return col_info
+
+
+# 全局数据画像实例
+data_profiler = DataProfiler()
@@ -0,0 +1,245 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# 数据点不超过该数量时直接附上原始数据点
+RAW_POINTS_LIMIT = 20
+# 摘要中列出的头部分组、强相关列对个数
+TOP_GROUPS = 5
+
+_CJK_PATTERN = re.compile(r"[\u3000-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计文本的 token 数：中文字符约1个 token，其余字符约4个字符1个 token"""
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _round(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def _numeric_field(chart_data: Dict[str, Any]) -> Optional[str]:
+    """图表数据中承载数值的字段"""
+    for key in ("value_field", "y_axis"):
+        field = chart_data.get(key)
+        if field:
+            return field
+    return None
+
+
+def _label_field(chart_data: Dict[str, Any]) -> Optional[str]:
+    """图表数据中承载标签的字段"""
+    for key in ("name_field", "x_axis"):
+        field = chart_data.get(key)
+        if field:
+            return field
+    return None
+
+
+def summarize_chart(chart_data: Dict[str, Any], include_points: bool = True) -> Dict[str, Any]:
+    """用统计量概括图表数据：极值、变化量、头部分组和分位数，代替原始数据点"""
+    chart_type = chart_data.get("chart_type")
+    records: List[Dict[str, Any]] = chart_data.get("data") or []
+    summary: Dict[str, Any] = {"chart_type": chart_type, "points": len(records)}
+
+    for key in ("granularity", "downsampled", "top_k", "order"):
+        if chart_data.get(key):
+            summary[key] = chart_data[key]
+
+    if chart_type == "heatmap":
+        summary["strongest_correlations"] = _strongest_correlations(chart_data)
+        return summary
+
+    if chart_type == "boxplot" and chart_data.get("summary"):
+        # 统计摘要本身已经是紧凑的
+        summary["columns"] = [{k: _round(v) for k, v in item.items()} for item in records]
+        return summary
+
+    if chart_type == "histogram" and chart_data.get("bins"):
+        bins = chart_data["bins"]
+        counts = bins.get("counts") or []
+        if counts:
+            peak = int(np.argmax(counts))
+            summary.update({
+                "bin_method": bins.get("method"),
+                "bin_count": len(counts),
+                "range": [_round(bins["edges"][0]), _round(bins["edges"][-1])],
+                "total": int(sum(counts)),
+                "peak_bin": [_round(bins["edges"][peak]), _round(bins["edges"][peak + 1]), counts[peak]]
+            })
+        return summary
+
+    value_field = _numeric_field(chart_data)
+    label_field = _label_field(chart_data)
+    if not records or value_field is None or value_field not in records[0]:
+        if include_points:
+            summary["sample_points"] = records[:RAW_POINTS_LIMIT]
+        return summary
+
+    labels = [record.get(label_field) for record in records] if label_field else list(range(len(records)))
+    values = np.array(
+        [record.get(value_field) if isinstance(record.get(value_field), (int, float)) else np.nan for record in records],
+        dtype="float64"
+    )
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return summary
+
+    valid_values = values[valid]
+    min_index = int(np.nanargmin(values))
+    max_index = int(np.nanargmax(values))
+    q25, q50, q75 = np.percentile(valid_values, [25, 50, 75])
+    summary.update({
+        "value_field": value_field,
+        "label_field": label_field,
+        "min": [labels[min_index], _round(float(values[min_index]))],
+        "max": [labels[max_index], _round(float(values[max_index]))],
+        "sum": _round(float(valid_values.sum())),
+        "mean": _round(float(valid_values.mean())),
+        "quantiles": {"p25": _round(float(q25)), "p50": _round(float(q50)), "p75": _round(float(q75))}
+    })
+
+    if chart_type == "line" and len(valid_values) >= 2:
+        # 时间序列：首尾变化和最大单步涨跌
+        first, last = valid_values[0], valid_values[-1]
+        summary["change"] = {
+            "first": [labels[int(np.argmax(valid))], _round(float(first))],
+            "last": [labels[len(values) - 1 - int(np.argmax(valid[::-1]))], _round(float(last))],
+            "delta": _round(float(last - first)),
+            "pct": _round(float((last - first) / abs(first))) if first else None
+        }
+        deltas = np.diff(values)
+        if (~np.isnan(deltas)).any():
+            rise = int(np.nanargmax(deltas))
+            fall = int(np.nanargmin(deltas))
+            summary["largest_rise"] = [labels[rise], labels[rise + 1], _round(float(deltas[rise]))]
+            summary["largest_fall"] = [labels[fall], labels[fall + 1], _round(float(deltas[fall]))]
+    elif chart_type in ("bar", "pie"):
+        # 分组：头部分组及其占比
+        order = np.argsort(-np.where(valid, values, -np.inf))[:TOP_GROUPS]
+        total = float(valid_values.sum())
+        summary["top_groups"] = [
+            [labels[i], _round(float(values[i])), _round(float(values[i]) / total) if total else None]
+            for i in order if valid[i]
+        ]
+
+    if include_points and len(records) <= RAW_POINTS_LIMIT:
+        summary["points_data"] = [[labels[i], _round(float(values[i])) if valid[i] else None] for i in range(len(records))]
+
+    return summary
+
+
+def _strongest_correlations(chart_data: Dict[str, Any]) -> List[List[Any]]:
+    """相关矩阵中绝对值最大的几组列对"""
+    columns = chart_data.get("columns") or []
+    matrix = chart_data.get("matrix") or []
+    pairs = [
+        [columns[i], columns[j], matrix[i][j]]
+        for i in range(len(columns))
+        for j in range(i + 1, len(columns))
+        if matrix[i][j] is not None
+    ]
+    pairs.sort(key=lambda pair: abs(pair[2]), reverse=True)
+    return pairs[:TOP_GROUPS]
+
+
+def relevant_column_profiles(
+    chart_data: Dict[str, Any],
+    data_summary: Dict[str, Any],
+    include_samples: bool = True
+) -> List[Dict[str, Any]]:
+    """只保留图表涉及的列的画像"""
+    names = {
+        chart_data.get(key)
+        for key in ("x_axis", "y_axis", "name_field", "value_field")
+    }
+    names.update(chart_data.get("columns") or [])
+    names.update(item.get("column") for item in chart_data.get("data") or [] if chart_data.get("summary"))
+
+    profiles = []
+    for col in data_summary.get("columns", []):
+        if col["name"] not in names:
+            continue
+        profile = {
+            key: _round(col[key])
+            for key in ("name", "dtype", "null_count", "unique_count", "min", "max", "mean", "std")
+            if col.get(key) is not None
+        }
+        if include_samples:
+            profile["sample_values"] = col.get("sample_values", [])[:3]
+        profiles.append(profile)
+    return profiles
+
+
+def build_insights_prompt(
+    question: str,
+    chart_data: Dict[str, Any],
+    data_summary: Dict[str, Any],
+    token_budget: int
+) -> str:
+    """构建洞察提示词，按详细程度递减尝试，直到估计的 token 数不超过预算"""
+    levels = [
+        {"include_points": True, "include_samples": True},
+        {"include_points": False, "include_samples": True},
+        {"include_points": False, "include_samples": False},
+    ]
+
+    for level in levels:
+        chart_text = _compact_json(summarize_chart(chart_data, include_points=level["include_points"]))
+        data_text = _compact_json({
+            "row_count": data_summary.get("row_count"),
+            "column_count": data_summary.get("column_count"),
+            "columns": relevant_column_profiles(chart_data, data_summary, include_samples=level["include_samples"])
+        })
+        prompt = _render_insights_prompt(question, chart_text, data_text)
+        if estimate_tokens(prompt) <= token_budget:
+            return prompt
+
+    # 仍超出预算时截断两段摘要，保留问题和输出格式说明
+    available = max(0, token_budget - estimate_tokens(_render_insights_prompt(question, "", "")))
+    return _render_insights_prompt(
+        question,
+        _truncate_to_tokens(chart_text, available * 2 // 3),
+        _truncate_to_tokens(data_text, available - available * 2 // 3)
+    )
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """截断文本使估计的 token 数不超过上限"""
+    while text and estimate_tokens(text) > max_tokens:
+        text = text[:int(len(text) * max_tokens / estimate_tokens(text) * 0.95)]
+    return text
+
+
+def _render_insights_prompt(question: str, chart_text: str, data_text: str) -> str:
+    return f"""
+用户问题: "{question}"
+
+图表数据摘要:
+{chart_text}
+
+相关列信息:
+{data_text}
+
+请基于以上数据生成3-5个有价值的洞察，返回JSON格式:
+{{
+    "insights": [
+        {{
+            "type": "trend|pattern|anomaly|recommendation",
+            "title": "洞察标题",
+            "description": "详细描述",
+            "importance": "high|medium|low"
+        }}
+    ]
+}}
+"""
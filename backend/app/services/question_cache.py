@@ -0,0 +1,100 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis import cache
+from app.services.executor import task_executor
+
+
+class SQLiteStore:
+    """基于本地 SQLite 文件的键值存储，带过期时间"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取未过期的值"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, expire: int) -> None:
+        """写入值，同时清理已过期的条目"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + expire)
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class QuestionAnalysisCache:
+    """问题分析结果缓存
+
+    优先存放在 Redis（经由两级缓存管理器）；Redis 不可用时写入本地 SQLite，
+    读取时 Redis 未命中再查 SQLite，命中后回填到缓存管理器。
+    """
+
+    def __init__(self, path: str):
+        self.store = SQLiteStore(path)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的问题分析结果"""
+        value = await cache.get(key)
+        if value is not None:
+            return value
+
+        try:
+            value = await task_executor.run(self.store.get, key)
+        except Exception as e:
+            print(f"Question cache read error: {e}")
+            return None
+
+        if value is not None:
+            await cache.set(key, value, expire=settings.QUESTION_CACHE_TTL)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """保存问题分析结果"""
+        if await cache.set(key, value, expire=settings.QUESTION_CACHE_TTL):
+            return
+
+        try:
+            await task_executor.run(self.store.set, key, value, settings.QUESTION_CACHE_TTL)
+        except Exception as e:
+            print(f"Question cache write error: {e}")
+
+    def close(self) -> None:
+        self.store.close()
+
+
+# 全局问题分析缓存实例
+question_cache = QuestionAnalysisCache(settings.QUESTION_CACHE_DB)
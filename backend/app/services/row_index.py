@@ -0,0 +1,112 @@
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+NEWLINE = ord("\n")
+QUOTE = ord('"')
+
+
+def row_index_path(file_path: str) -> str:
+    """CSV行索引文件路径，与原文件放在一起"""
+    return str(Path(file_path).with_suffix(".rowidx.npz"))
+
+
+def build_csv_row_index(file_path: str, stride: int, block_size: int = 1024 * 1024) -> Optional[str]:
+    """扫描一遍CSV，每隔 stride 行记录该行起始的字节偏移，写入稀疏行索引
+
+    按引号奇偶判断换行是否位于带引号的字段内，字段中的换行不视为行尾。
+    GBK/GB18030 的多字节字符不含 '"' 和换行字节，可直接按字节扫描；失败时返回None。
+    """
+    index_path = row_index_path(file_path)
+    offsets: List[int] = []
+    row_count = -1  # 第一行是表头
+    in_quotes = False
+    position = 0
+    last_row_end = 0
+
+    try:
+        with open(file_path, "rb") as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                data = np.frombuffer(block, dtype=np.uint8)
+
+                # 每个字节之前（含自身）引号个数的奇偶，加上前一块结尾的状态
+                quote_parity = (np.cumsum(data == QUOTE) + in_quotes) % 2
+                newlines = np.flatnonzero(data == NEWLINE)
+                row_ends = newlines[quote_parity[newlines] == 0]
+
+                if row_ends.size:
+                    # 每个行尾之后是第几行数据，只记录 stride 整数倍的行
+                    row_numbers = np.arange(row_count + 1, row_count + 1 + row_ends.size)
+                    checkpoints = row_ends[row_numbers % stride == 0]
+                    offsets.extend((position + checkpoints + 1).tolist())
+                    row_count += int(row_ends.size)
+                    last_row_end = position + int(row_ends[-1]) + 1
+
+                in_quotes = bool(quote_parity[-1])
+                position += len(block)
+
+        # 文件末尾没有换行时最后一行也计入
+        if position > last_row_end:
+            row_count += 1
+        if offsets and offsets[-1] >= position:
+            offsets.pop()
+
+        np.savez(
+            index_path,
+            offsets=np.asarray(offsets, dtype=np.int64),
+            stride=stride,
+            row_count=max(row_count, 0)
+        )
+        return index_path
+    except Exception as e:
+        print(f"Row index build error: {e}")
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        return None
+
+
+def load_row_index(file_path: str) -> Optional[dict]:
+    """读取行索引，不存在或早于数据文件时返回None"""
+    index_path = row_index_path(file_path)
+    try:
+        if os.path.getmtime(index_path) < os.path.getmtime(file_path):
+            return None
+        with np.load(index_path) as index:
+            return {
+                "offsets": index["offsets"],
+                "stride": int(index["stride"]),
+                "row_count": int(index["row_count"])
+            }
+    except OSError:
+        return None
+
+
+def read_csv_rows(
+    file_path: str,
+    index: dict,
+    offset: int,
+    limit: int,
+    encoding: str
+) -> pd.DataFrame:
+    """定位到距 offset 最近的索引点后读取 limit 行，读取量与数据集大小和页码无关"""
+    columns = pd.read_csv(file_path, encoding=encoding, nrows=0).columns
+    checkpoint = offset // index["stride"]
+    if checkpoint >= len(index["offsets"]) or limit <= 0:
+        return pd.DataFrame(columns=columns)
+
+    with open(file_path, "rb") as f:
+        f.seek(int(index["offsets"][checkpoint]))
+        return pd.read_csv(
+            f,
+            encoding=encoding,
+            header=None,
+            names=columns,
+            skiprows=offset - checkpoint * index["stride"],
+            nrows=limit
+        )
@@ -0,0 +1,67 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from app.core.config import settings
+from app.core.redis import cache
+
+
+class SingleFlight:
+    """合并并发的相同请求
+
+    进程内：相同 key 的并发调用共享同一个计算任务；
+    跨进程：通过 Redis 租约选出一个 worker 计算，其余 worker 轮询结果缓存。
+    key 即结果的缓存键，计算函数需要在返回前把结果写入该键。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """执行或加入 key 对应的计算"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_with_lease(key, func))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # 单个请求被取消时不影响其他等待者
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # 所有等待者都已取消时避免“异常未被获取”的警告
+            task.exception()
+
+    async def _run_with_lease(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        lease_key = f"lease:{key}"
+        token = uuid.uuid4().hex
+        acquired = await cache.acquire_lock(lease_key, token, settings.SINGLE_FLIGHT_LEASE_TTL)
+
+        # Redis 不可用时只做进程内合并
+        if acquired is None or acquired:
+            try:
+                return await func()
+            finally:
+                if acquired:
+                    await cache.release_lock(lease_key, token)
+
+        # 其他 worker 正在计算，等待其结果写入缓存
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_LEASE_TTL
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+            result = await cache.get(key)
+            if result:
+                return result
+            if not await cache.lock_exists(lease_key):
+                # 持有者失败或租约过期且没有写入结果，自行计算
+                break
+
+        return await func()
+
+
+# 全局请求合并实例
+single_flight = SingleFlight()
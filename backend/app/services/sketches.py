@@ -0,0 +1,157 @@
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """把一列值哈希为 uint64，相同的值在不同分块中得到相同的哈希"""
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """向量化计算 uint64 的有效位数"""
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        has_high_bits = values >= np.uint64(1 << shift)
+        lengths[has_high_bits] += shift
+        values[has_high_bits] >>= np.uint64(shift)
+    lengths[values > 0] += 1
+    return lengths
+
+
+class HyperLogLog:
+    """HyperLogLog 基数估计，可按分块更新并与其他草图合并"""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = np.zeros(self.num_registers, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        """用一批哈希值更新寄存器"""
+        if len(hashes) == 0:
+            return
+
+        hashes = hashes.astype(np.uint64, copy=False)
+        suffix_bits = 64 - self.precision
+        indexes = (hashes >> np.uint64(suffix_bits)).astype(np.intp)
+        suffixes = hashes & np.uint64((1 << suffix_bits) - 1)
+        # 前导零个数 + 1
+        ranks = (suffix_bits - _bit_length(suffixes) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, indexes, ranks)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """合并另一个相同精度的草图"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """估计不同值的个数"""
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+
+        # 小基数时使用线性计数修正
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+
+        return int(round(estimate))
+
+
+class MomentsAccumulator:
+    """流式计算 count/min/max/mean/std，分块结果按 Chan 公式合并"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def update(self, values: np.ndarray) -> None:
+        """用一批非空数值更新统计量"""
+        values = np.asarray(values, dtype="float64")
+        if len(values) == 0:
+            return
+
+        other = MomentsAccumulator()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other: "MomentsAccumulator") -> None:
+        """合并另一个累加器"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self) -> Optional[float]:
+        """样本标准差（ddof=1），与 pandas 一致"""
+        if self.count < 2:
+            return None
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+class ReservoirSampler:
+    """蓄水池抽样，保留流中等概率的 k 个样本"""
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self.samples: List[Any] = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: pd.Series) -> None:
+        """用一批值更新蓄水池"""
+        n = len(values)
+        if n == 0:
+            return
+
+        # 蓄水池未满时直接填充
+        fill = min(max(self.size - len(self.samples), 0), n)
+        self.samples.extend(values.iloc[:fill].tolist())
+
+        if fill < n:
+            # 第 i 个元素以 size / (i + 1) 的概率替换一个已有样本
+            positions = np.arange(self.seen + fill, self.seen + n)
+            slots = self._rng.integers(0, positions + 1)
+            accepted = np.flatnonzero(slots < self.size)
+            replacements = values.iloc[fill + accepted].tolist()
+            for slot, value in zip(slots[accepted], replacements):
+                self.samples[slot] = value
+
+        self.seen += n
+
+    def merge(self, other: "ReservoirSampler") -> None:
+        """合并另一个蓄水池，按两者各自见过的元素数加权抽取"""
+        total = self.seen + other.seen
+        if other.seen == 0:
+            return
+
+        size = min(self.size, len(self.samples) + len(other.samples))
+        # 超几何分布决定从两边各取多少个
+        from_self = int(self._rng.hypergeometric(self.seen, other.seen, size)) if self.seen else 0
+        from_self = min(from_self, len(self.samples))
+        from_other = min(size - from_self, len(other.samples))
+
+        picked_self = self._rng.choice(len(self.samples), from_self, replace=False) if from_self else []
+        picked_other = self._rng.choice(len(other.samples), from_other, replace=False) if from_other else []
+        self.samples = [self.samples[i] for i in picked_self] + [other.samples[i] for i in picked_other]
+        self.seen = total
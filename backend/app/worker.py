@@ -0,0 +1,23 @@
+from celery import Celery
+
+from app.core.config import settings
+from app.services.ingestion import run_ingestion_job
+
+# Celery 应用，启动方式：celery -A app.worker worker --loglevel=info
+celery_app = Celery(
+    "data_analysis",
+    broker=settings.CELERY_BROKER_URL or None,
+    backend=settings.CELERY_RESULT_BACKEND or None
+)
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    task_acks_late=True,
+    worker_prefetch_multiplier=1
+)
+
+
+@celery_app.task(name="datasets.ingest")
+def ingest_dataset(job_id: int) -> None:
+    """数据集入库任务"""
+    run_ingestion_job(job_id)
@@ -0,0 +1,111 @@
+"""数据画像性能对比：逐列实现 vs 向量化实现
+
+运行方式（在 backend 目录下）:
+    python benchmarks/profile_benchmark.py [行数] [列数]
+"""
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.profiler import DataProfiler  # noqa: E402
+
+
+def legacy_analyze_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
+    """原有的逐列画像实现"""
+    info = {
+        "row_count": len(df),
+        "column_count": len(df.columns),
+        "columns": []
+    }
+
+    for col in df.columns:
+        col_info = {
+            "name": col,
+            "dtype": str(df[col].dtype),
+            "null_count": int(df[col].isnull().sum()),
+            "unique_count": int(df[col].nunique()),
+            "sample_values": df[col].dropna().head(5).tolist()
+        }
+
+        if pd.api.types.is_numeric_dtype(df[col]):
+            col_info.update({
+                "min": float(df[col].min()) if not pd.isna(df[col].min()) else None,
+                "max": float(df[col].max()) if not pd.isna(df[col].max()) else None,
+                "mean": float(df[col].mean()) if not pd.isna(df[col].mean()) else None,
+                "std": float(df[col].std()) if not pd.isna(df[col].std()) else None
+            })
+
+        info["columns"].append(col_info)
+
+    return info
+
+
+def build_frame(rows: int, cols: int) -> pd.DataFrame:
+    """构造包含数值、分类、空值的宽表"""
+    rng = np.random.default_rng(42)
+    data = {}
+    for i in range(cols):
+        kind = i % 4
+        if kind == 0:
+            data[f"int_{i}"] = rng.integers(0, 10_000, rows)
+        elif kind == 1:
+            values = rng.normal(100, 15, rows)
+            values[rng.random(rows) < 0.05] = np.nan
+            data[f"float_{i}"] = values
+        elif kind == 2:
+            data[f"cat_{i}"] = rng.choice(["华东", "华南", "华北", "西南"], rows)
+        else:
+            data[f"flag_{i}"] = rng.random(rows) < 0.5
+    return pd.DataFrame(data)
+
+
+def assert_equivalent(expected: Dict[str, Any], actual: Dict[str, Any]) -> None:
+    """校验两种实现输出结构一致、数值在浮点误差内相等"""
+    assert expected.keys() == actual.keys()
+    assert expected["row_count"] == actual["row_count"]
+    assert expected["column_count"] == actual["column_count"]
+    for exp_col, act_col in zip(expected["columns"], actual["columns"]):
+        assert list(exp_col.keys()) == list(act_col.keys()), exp_col["name"]
+        for key, exp_value in exp_col.items():
+            act_value = act_col[key]
+            if isinstance(exp_value, float):
+                assert np.isclose(exp_value, act_value, rtol=1e-12), (exp_col["name"], key)
+            else:
+                assert exp_value == act_value, (exp_col["name"], key)
+
+
+def timeit(func, df: pd.DataFrame, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    df = build_frame(rows, cols)
+    profiler = DataProfiler()
+
+    assert_equivalent(legacy_analyze_dataframe(df), profiler.profile(df))
+
+    legacy_time = timeit(legacy_analyze_dataframe, df)
+    vectorized_time = timeit(profiler.profile, df)
+
+    print(f"数据规模: {rows} 行 x {cols} 列")
+    print(f"逐列实现:   {legacy_time * 1000:.1f} ms")
+    print(f"向量化实现: {vectorized_time * 1000:.1f} ms")
+    print(f"加速比:     {legacy_time / vectorized_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,29 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, run_migrations
+from app.core.redis import cache
+from app.services.executor import task_executor
+from app.services.question_cache import question_cache
 from app.api import api_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 启动时创建数据库表
-    Base.metadata.create_all(bind=engine)
+    # 启动时把数据库结构升级到最新版本，create_all 不会给已有的表补列
+    await asyncio.to_thread(run_migrations)
+    # 订阅跨进程缓存失效通知
+    await cache.start_invalidation_listener()
     yield
     # 关闭时的清理工作
+    await cache.close()
+    question_cache.close()
+    task_executor.shutdown()
+    await async_engine.dispose()
 
 
 # 创建FastAPI应用
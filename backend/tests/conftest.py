@@ -0,0 +1,14 @@
+import fakeredis
+import pytest
+
+from app.core.redis import CacheManager
+
+
+def make_cache(server: fakeredis.FakeServer) -> CacheManager:
+    """创建连接到 fake Redis 的缓存管理器，每个实例有独立的 L1"""
+    return CacheManager(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
@@ -0,0 +1,110 @@
+import asyncio
+
+import redis.asyncio as redis
+
+from app.core.local_cache import MISSING
+from tests.conftest import make_cache
+
+
+def test_set_and_get_through_redis(redis_server):
+    async def scenario():
+        writer, reader = make_cache(redis_server), make_cache(redis_server)
+        assert await writer.set("k", {"a": 1})
+        # 另一个 worker 的 L1 没有该键，从 Redis 读取后回填 L1
+        assert reader.local.get("k") is MISSING
+        assert await reader.get("k") == {"a": 1}
+        assert reader.local.get("k") == {"a": 1}
+
+    asyncio.run(scenario())
+
+
+def test_l1_serves_without_redis_round_trip(redis_server):
+    async def scenario():
+        cache = make_cache(redis_server)
+        await cache.set("k", [1, 2])
+        await cache.client.delete("k")
+        assert await cache.get("k") == [1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_mget_and_mset(redis_server):
+    async def scenario():
+        writer, reader = make_cache(redis_server), make_cache(redis_server)
+        assert await writer.mset({"a": 1, "b": {"x": "中文"}})
+        assert await reader.mget(["a", "missing", "b"]) == [1, None, {"x": "中文"}]
+
+    asyncio.run(scenario())
+
+
+def test_delete_invalidates_other_workers(redis_server):
+    async def scenario():
+        writer, reader = make_cache(redis_server), make_cache(redis_server)
+        await writer.set("k", 1)
+        assert await reader.get("k") == 1
+
+        await reader.start_invalidation_listener()
+        await asyncio.sleep(0.05)
+        assert await writer.delete("k")
+
+        for _ in range(50):
+            if reader.local.get("k") is MISSING:
+                break
+            await asyncio.sleep(0.01)
+        assert reader.local.get("k") is MISSING
+        assert await reader.get("k") is None
+        await reader.close()
+
+    asyncio.run(scenario())
+
+
+def test_falls_back_to_l1_when_redis_is_down(redis_server):
+    async def scenario():
+        cache = make_cache(redis_server)
+        redis_server.connected = False
+
+        assert not await cache.set("k", 1)
+        assert not cache.redis_available
+        # 降级期间仍由 L1 提供读写，不再访问 Redis
+        assert await cache.get("k") == 1
+        assert await cache.get("other") is None
+        assert await cache.acquire_lock("lock", "token", 10) is None
+        assert cache.stats()["redis_available"] is False
+
+    asyncio.run(scenario())
+
+
+def test_command_errors_do_not_disable_redis(redis_server):
+    class FailingRedis(redis.Redis):
+        async def setex(self, *args, **kwargs):
+            raise redis.ResponseError("unknown command")
+
+    async def scenario():
+        cache = make_cache(redis_server)
+        cache.client = FailingRedis(connection_pool=cache.client.connection_pool)
+        assert not await cache.set("k", 1)
+        assert cache.redis_available
+
+    asyncio.run(scenario())
+
+
+def test_unserializable_value_stays_in_l1(redis_server):
+    async def scenario():
+        cache = make_cache(redis_server)
+        value = {"v": object()}
+        assert not await cache.set("k", value)
+        assert cache.redis_available
+        assert await cache.get("k") is value
+        assert not await cache.client.exists("k")
+
+    asyncio.run(scenario())
+
+
+def test_counters(redis_server):
+    async def scenario():
+        cache = make_cache(redis_server)
+        await cache.incr("hits")
+        await cache.incr_many({"hits": 2, "misses": 3, "unused": 0})
+        assert await cache.get_counters(["hits", "misses", "unused"]) == [3, 3, 0]
+
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.services.data_processor import data_processor
+
+
+@pytest.fixture
+def drifting_csv(tmp_path, monkeypatch):
+    # 每块3行，第二块起 code 出现文本、price 出现小数、flag 出现非布尔值
+    monkeypatch.setattr(settings, "PROFILE_CHUNK_SIZE", 3)
+    path = tmp_path / "drift.csv"
+    path.write_text(
+        "id,code,price,flag,day\n"
+        "1,1,10,True,2024-01-01\n"
+        "2,2,20,False,2024-01-02\n"
+        "3,3,30,True,2024-01-03\n"
+        "4,a,10.5,True,2024-01-04\n"
+        "5,,,x,2024-01-05\n"
+        "6,7,12,,2024-01-06\n",
+        encoding="utf-8"
+    )
+    return str(path)
+
+
+def test_drifting_chunks_are_unified_instead_of_dropping_the_copy(drifting_csv):
+    columnar_path, datetime_formats = data_processor.convert_file_to_columnar(drifting_csv, encoding="utf-8")
+
+    assert columnar_path is not None
+    assert datetime_formats == {"day": "ISO8601"}
+
+    loaded = data_processor.load_data(drifting_csv, columnar_path=columnar_path)
+    expected = pd.read_csv(drifting_csv)
+    # 与整体读取原始文件得到的类型一致
+    assert loaded.dtypes.to_dict() == expected.dtypes.to_dict()
+    assert loaded["code"].tolist()[:4] == ["1", "2", "3", "a"]
+    assert loaded["price"].tolist()[3] == 10.5
+    assert loaded["flag"].tolist()[4] == "x"
+
+
+def test_consistent_chunks_keep_inferred_types(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_CHUNK_SIZE", 2)
+    path = tmp_path / "plain.csv"
+    pd.DataFrame({"n": range(7), "s": list("abcdefg")}).to_csv(path, index=False)
+
+    columnar_path, _ = data_processor.convert_file_to_columnar(str(path), encoding="utf-8")
+
+    loaded = data_processor.load_data(str(path), columnar_path=columnar_path)
+    assert str(loaded["n"].dtype) == "int64"
+    assert loaded["s"].tolist() == list("abcdefg")
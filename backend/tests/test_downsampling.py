@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from app.services.downsampling import downsample_series, lttb_indices
+
+
+def test_short_series_is_returned_unchanged():
+    df = pd.DataFrame({"x": range(10), "y": range(10)})
+    assert downsample_series(df, "x", "y", 20) is df
+
+
+def test_keeps_endpoints_and_target_size():
+    x = np.arange(10_000, dtype="float64")
+    y = np.sin(x / 100)
+    indices = lttb_indices(x, y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_preserves_spikes():
+    y = np.zeros(5000)
+    y[1234], y[4321] = 100.0, -100.0
+    df = pd.DataFrame({"x": np.arange(5000), "y": y})
+    result = downsample_series(df, "x", "y", 100)
+    assert len(result) == 100
+    assert {1234, 4321} <= set(result.index)
+
+
+def test_datetime_and_text_axes():
+    times = pd.date_range("2024-01-01", periods=3000, freq="h")
+    values = np.random.default_rng(0).normal(size=3000)
+    by_time = downsample_series(pd.DataFrame({"t": times, "v": values}), "t", "v", 200)
+    by_label = downsample_series(pd.DataFrame({"t": times.astype(str), "v": values}), "t", "v", 200)
+    assert len(by_time) == len(by_label) == 200
+    # 等间距的时间轴与按序号计算的结果一致
+    assert list(by_time.index) == list(by_label.index)
+
+
+def test_missing_values_do_not_break_selection():
+    y = np.arange(1000, dtype="float64")
+    y[::7] = np.nan
+    result = downsample_series(pd.DataFrame({"x": np.arange(1000), "y": y}), "x", "y", 50)
+    assert len(result) == 50
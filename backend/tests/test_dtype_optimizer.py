@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_processor import data_processor
+from app.services.dtype_optimizer import apply_dtypes, measure_dtypes, memory_bytes, plan_dtypes
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    return pd.DataFrame({
+        "地区": rng.choice(["华东", "华南", "华北", "西部", None], n),
+        "产品": rng.choice([f"P{i}" for i in range(300)], n),
+        "数量": rng.integers(0, 100, n),
+        "金额": rng.integers(-30_000, 30_000, n),
+        "大数": rng.integers(0, 2 ** 40, n),
+        "价格": rng.random(n) * 100,
+        "月份": rng.choice(["2024-01", "2024-02", "2024-03"], n),
+        "编号": [f"id{i}" for i in range(n)],
+    })
+
+
+def _schema(df, exclude=()):
+    return plan_dtypes(data_processor.analyze_dataframe(df), 0.5, 100_000, exclude=exclude)
+
+
+def test_plan_picks_lossless_compact_types(frame):
+    schema = _schema(frame, exclude={"月份"})
+    assert schema == {"地区": "category", "产品": "category", "数量": "int8", "金额": "int16"}
+
+
+def test_apply_reduces_memory_and_keeps_values(frame):
+    schema = _schema(frame)
+    optimized = apply_dtypes(frame, schema)
+
+    assert memory_bytes(optimized) < memory_bytes(frame) / 2
+    assert str(frame["数量"].dtype) == "int64"  # 原 DataFrame 不变
+    for column in frame.columns:
+        assert optimized[column].astype(object).equals(frame[column].astype(object))
+
+
+def test_apply_skips_conversions_that_would_lose_data():
+    df = pd.DataFrame({"n": [1, 300], "mixed": ["a", 1], "f": [1.5, 2.5]})
+    result = apply_dtypes(df, {"n": "int8", "mixed": "category", "f": "int8", "missing": "int8"})
+    assert result is df
+
+
+def test_measure_matches_whole_frame(frame):
+    schema = _schema(frame)
+    before, after = measure_dtypes([frame], schema)
+    assert before == memory_bytes(frame)
+    assert after == memory_bytes(apply_dtypes(frame, schema))
+
+
+QUERIES = [
+    ("comparison", {"category_column": "地区", "value_column": "金额"}),
+    ("comparison", {"category_column": "产品", "value_column": "数量", "top_k": 10}),
+    ("distribution", {"column": "地区"}),
+    ("distribution", {"column": "产品"}),
+    ("distribution", {"column": "数量"}),
+    ("ranking", {"category_column": "产品", "value_column": "金额"}),
+    ("proportion", {"category_column": "地区"}),
+    ("proportion", {"category_column": "产品", "value_column": "数量"}),
+    ("trend", {"time_column": "月份", "value_column": "金额"}),
+    ("trend", {"time_column": "地区", "value_column": "数量"}),
+    ("stat_summary", {"column": "金额"}),
+    ("correlation", {}),
+    ("basic", {}),
+]
+
+
+@pytest.mark.parametrize("query_type,parameters", QUERIES)
+def test_query_results_are_unchanged(frame, query_type, parameters):
+    optimized = apply_dtypes(frame, _schema(frame))
+    config = {"query_type": query_type, "parameters": parameters}
+
+    def dumps(result):
+        return json.dumps(result, sort_keys=True, ensure_ascii=False, default=str)
+
+    assert dumps(data_processor.query_data(optimized, config)) == dumps(data_processor.query_data(frame, config))
+
+
+def test_filtered_category_has_no_empty_groups(frame):
+    # 过滤后 category 列仍保留全部类别，分组结果不应出现计数为0的类别
+    optimized = apply_dtypes(frame, _schema(frame))
+    subset = optimized[optimized["地区"] == "华东"]
+    config = {"query_type": "distribution", "parameters": {"column": "地区"}}
+    assert data_processor.query_data(subset, config)["data"] == [{"地区": "华东", "count": len(subset)}]
+
+
+@pytest.mark.parametrize("profile_mode", ["exact", "approximate"])
+def test_ingest_persists_schema_and_loads_compact_types(frame, tmp_path, profile_mode):
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+
+    data_info, columnar_path, dtype_info = data_processor.ingest_file(str(path), encoding="utf-8", profile_mode=profile_mode)
+
+    assert dtype_info["dtype_schema"] == {"地区": "category", "产品": "category", "数量": "int8", "金额": "int16"}
+    assert dtype_info["optimized_memory_bytes"] < dtype_info["memory_bytes"]
+    # 列信息按原始类型记录
+    assert {col["name"]: col["dtype"] for col in data_info["columns"]}["数量"] == "int64"
+
+    loaded = data_processor.load_data(str(path), columnar_path=columnar_path, dtype_schema=dtype_info["dtype_schema"])
+    assert str(loaded["数量"].dtype) == "int8"
+    assert isinstance(loaded["地区"].dtype, pd.CategoricalDtype)
+    assert loaded["月份"].dtype == object
+    expected = pd.read_csv(path)
+    for column in expected.columns:
+        assert loaded[column].astype(object).equals(expected[column].astype(object))
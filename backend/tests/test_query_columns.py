@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.services.data_processor import data_processor
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "名称": ["a", "b", "c", "d"],
+        "数量": [1, 2, 3, 5],
+        "价格": [4.0, 3.0, 2.5, 1.0],
+        "启用": [True, False, True, True],
+    })
+
+
+def _query(df, query_type, parameters):
+    return data_processor.query_data(df, {"query_type": query_type, "parameters": parameters})
+
+
+def test_correlation_keeps_only_numeric_requested_columns(frame):
+    result = _query(frame, "correlation", {"columns": ["数量", "名称", "启用", "价格", "不存在"]})
+    assert result["columns"] == ["数量", "价格"]
+
+
+@pytest.mark.parametrize("columns", [["名称", "数量"], ["启用", "名称"], "数量,价格", [["数量"], "价格"]])
+def test_correlation_falls_back_to_numeric_columns(frame, columns):
+    result = _query(frame, "correlation", {"columns": columns})
+    assert result["chart_type"] == "heatmap"
+    assert result["columns"] == ["数量", "价格"]
+
+
+def test_correlation_without_two_numeric_columns_uses_basic_analysis(frame):
+    result = _query(frame[["名称", "数量", "启用"]], "correlation", {"columns": ["名称", "启用"]})
+    assert result["chart_type"] != "heatmap"
+
+
+def test_stat_summary_skips_bool_columns_by_default(frame):
+    result = _query(frame, "stat_summary", {})
+    assert [row["column"] for row in result["data"]] == ["数量", "价格"]
+
+
+@pytest.mark.parametrize("column", ["启用", "名称"])
+def test_stat_summary_rejects_non_numeric_column(frame, column):
+    with pytest.raises(HTTPException) as excinfo:
+        _query(frame, "stat_summary", {"column": column})
+    assert "统计摘要需要指定数值列" in excinfo.value.detail
@@ -0,0 +1,88 @@
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.services.data_processor import data_processor
+from app.services.row_index import build_csv_row_index, load_row_index, read_csv_rows
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    rows = [
+        {"id": i, "name": f"名称{i}", "note": "多行\n备注" if i % 7 == 0 else f'含"引号"{i}'}
+        for i in range(2500)
+    ]
+    path = tmp_path / "data.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path, pd.read_csv(path)
+
+
+def _dataset(path, **kwargs):
+    return SimpleNamespace(
+        id=1,
+        file_path=str(path),
+        columnar_path=kwargs.get("columnar_path"),
+        encoding="utf-8",
+        row_count=kwargs.get("row_count"),
+        dtype_schema=None,
+    )
+
+
+@pytest.mark.parametrize("offset,limit", [(0, 5), (999, 3), (1000, 10), (1995, 20), (2490, 50), (3000, 5)])
+def test_read_csv_rows_matches_full_read(csv_file, offset, limit):
+    path, expected = csv_file
+    assert build_csv_row_index(str(path), stride=1000, block_size=4096)
+
+    index = load_row_index(str(path))
+    assert index["row_count"] == len(expected)
+
+    page = read_csv_rows(str(path), index, offset, limit, "utf-8")
+    pd.testing.assert_frame_equal(
+        page.reset_index(drop=True),
+        expected.iloc[offset:offset + limit].reset_index(drop=True),
+        check_dtype=offset < len(expected)
+    )
+
+
+def test_index_without_trailing_newline(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n3,4")
+    build_csv_row_index(str(path), stride=1)
+    index = load_row_index(str(path))
+    assert index["row_count"] == 2
+    assert read_csv_rows(str(path), index, 1, 5, "utf-8").to_dict("records") == [{"a": 3, "b": 4}]
+
+
+def test_stale_index_is_ignored(csv_file):
+    path, _ = csv_file
+    build_csv_row_index(str(path), stride=1000)
+    index_path = path.with_suffix(".rowidx.npz")
+    stale = path.stat().st_mtime - 10
+    os.utime(index_path, (stale, stale))
+    assert load_row_index(str(path)) is None
+
+
+def test_read_rows_from_csv_and_columnar_copy(csv_file, monkeypatch):
+    path, expected = csv_file
+    monkeypatch.setattr(settings, "ROW_INDEX_STRIDE", 500)
+    data_processor.build_row_index(str(path), "utf-8")
+
+    df, total = data_processor.read_rows(_dataset(path), 1490, 20)
+    assert total == len(expected)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected.iloc[1490:1510].reset_index(drop=True))
+
+    monkeypatch.setattr(settings, "PARQUET_ROW_GROUP_SIZE", 300)
+    columnar_path = data_processor.convert_to_columnar(expected, str(path))
+    df, total = data_processor.read_rows(_dataset(path, columnar_path=columnar_path), 1490, 20)
+    assert total == len(expected)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected.iloc[1490:1510].reset_index(drop=True))
+
+
+def test_read_rows_without_index(csv_file):
+    path, expected = csv_file
+    df, total = data_processor.read_rows(_dataset(path, row_count=len(expected)), 100, 5)
+    assert total == len(expected)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected.iloc[100:105].reset_index(drop=True))
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import single_flight as single_flight_module
+from app.services.single_flight import SingleFlight
+from tests.conftest import make_cache
+
+
+@pytest.fixture
+def flight(redis_server, monkeypatch):
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(single_flight_module, "cache", make_cache(redis_server))
+    return SingleFlight()
+
+
+def test_concurrent_calls_share_one_computation(flight):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        await single_flight_module.cache.set("result", {"n": calls})
+        return {"n": calls}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("result", compute) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [{"n": 1}] * 5
+    assert calls == 1
+
+
+def test_lease_is_released_after_computation(flight):
+    # 释放租约使用 Lua 脚本，fake Redis 需要 lupa
+    pytest.importorskip("lupa")
+
+    async def compute():
+        return "done"
+
+    async def scenario():
+        assert await flight.do("result", compute) == "done"
+        assert not await single_flight_module.cache.lock_exists("lease:result")
+
+    asyncio.run(scenario())
+
+
+def test_waits_for_result_from_lease_holder(flight):
+    async def compute():
+        raise AssertionError("其他 worker 持有租约时不应重复计算")
+
+    async def scenario():
+        cache = single_flight_module.cache
+        assert await cache.acquire_lock("lease:result", "other-worker", 10)
+
+        async def other_worker_finishes():
+            await asyncio.sleep(0.05)
+            await cache.client.set("result", '{"n": 1}')
+
+        waiter = asyncio.ensure_future(flight.do("result", compute))
+        await other_worker_finishes()
+        return await waiter
+
+    assert asyncio.run(scenario()) == {"n": 1}
+
+
+def test_computes_when_lease_expires_without_result(flight):
+    async def compute():
+        return "recomputed"
+
+    async def scenario():
+        cache = single_flight_module.cache
+        assert await cache.acquire_lock("lease:result", "other-worker", 10)
+        waiter = asyncio.ensure_future(flight.do("result", compute))
+        await asyncio.sleep(0.03)
+        await cache.client.delete("lease:result")
+        return await waiter
+
+    assert asyncio.run(scenario()) == "recomputed"
+
+
+def test_computes_locally_when_redis_is_down(flight, redis_server):
+    redis_server.connected = False
+
+    async def compute():
+        return "local"
+
+    assert asyncio.run(flight.do("result", compute)) == "local"
+
+
+def test_errors_propagate_to_all_waiters(flight):
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do("result", compute) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.profiler import data_profiler
+from app.services.sketches import HyperLogLog, MomentsAccumulator, ReservoirSampler, hash_values
+
+
+def test_hyperloglog_estimates_distinct_count():
+    values = pd.Series(np.arange(100_000) % 20_000)
+    sketch = HyperLogLog()
+    sketch.update(hash_values(values))
+    assert sketch.count() == pytest.approx(20_000, rel=0.03)
+
+
+def test_hyperloglog_small_cardinality_is_exact():
+    sketch = HyperLogLog()
+    sketch.update(hash_values(pd.Series(["a", "b", "c", "a"])))
+    assert sketch.count() == 3
+
+
+def test_hyperloglog_merge_equals_single_pass():
+    values = pd.Series(np.random.default_rng(0).integers(0, 50_000, 200_000))
+    whole = HyperLogLog()
+    whole.update(hash_values(values))
+
+    merged = HyperLogLog()
+    for start in range(0, len(values), 30_000):
+        part = HyperLogLog()
+        part.update(hash_values(values.iloc[start:start + 30_000]))
+        merged.merge(part)
+
+    assert merged.count() == whole.count()
+
+
+def test_moments_match_pandas_across_chunks():
+    values = np.random.default_rng(1).normal(100, 15, 10_007)
+    moments = MomentsAccumulator()
+    for chunk in np.array_split(values, 7):
+        moments.update(chunk)
+
+    series = pd.Series(values)
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(series.mean(), rel=1e-12)
+    assert moments.std == pytest.approx(series.std(), rel=1e-12)
+    assert (moments.min, moments.max) == (series.min(), series.max())
+
+
+def test_moments_std_needs_two_values():
+    moments = MomentsAccumulator()
+    moments.update(np.array([5.0]))
+    assert moments.std is None
+
+
+def test_reservoir_keeps_size_and_draws_from_stream():
+    sampler = ReservoirSampler(5)
+    for start in range(0, 1000, 100):
+        sampler.update(pd.Series(range(start, start + 100)))
+
+    assert sampler.seen == 1000
+    assert len(sampler.samples) == 5
+    assert set(sampler.samples) <= set(range(1000))
+
+
+def test_reservoir_is_roughly_uniform():
+    hits = np.zeros(10)
+    for seed in range(400):
+        sampler = ReservoirSampler(1, seed=seed)
+        for start in range(0, 10, 3):
+            sampler.update(pd.Series(range(start, min(start + 3, 10))))
+        hits[sampler.samples[0]] += 1
+    # 每个元素期望被选中 40 次
+    assert hits.min() > 15 and hits.max() < 70
+
+
+def test_reservoir_merge_keeps_size():
+    left, right = ReservoirSampler(5, seed=1), ReservoirSampler(5, seed=2)
+    left.update(pd.Series(range(100)))
+    right.update(pd.Series(range(100, 130)))
+    left.merge(right)
+    assert left.seen == 130
+    assert len(left.samples) == 5
+
+
+def test_chunked_profile_matches_exact_profile():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        "value": rng.normal(0, 1, 5000),
+        "count": rng.integers(0, 100, 5000),
+        "region": rng.choice(["华东", "华南", None], 5000),
+    })
+    exact = data_profiler.profile(df)
+    approx = data_profiler.profile_chunks(df.iloc[start:start + 700] for start in range(0, len(df), 700))
+
+    assert approx["row_count"] == exact["row_count"]
+    for exact_col, approx_col in zip(exact["columns"], approx["columns"]):
+        assert approx_col["name"] == exact_col["name"]
+        assert approx_col["null_count"] == exact_col["null_count"]
+        assert approx_col["unique_count"] == pytest.approx(exact_col["unique_count"], rel=0.03)
+        for key in ("min", "max", "mean", "std"):
+            if key in exact_col:
+                assert approx_col[key] == pytest.approx(exact_col[key], rel=1e-9)
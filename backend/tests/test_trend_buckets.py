@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from app.services.data_processor import data_processor
+
+
+def _trend(df, granularity):
+    config = {
+        "query_type": "trend",
+        "parameters": {"time_column": "时间", "value_column": "数量", "granularity": granularity},
+    }
+    return data_processor.query_data(df, config)
+
+
+@pytest.fixture
+def hourly():
+    # 2023-01-01 是周日，2023-01-02 是周一
+    times = pd.date_range("2023-01-01", "2023-01-16", freq="h", inclusive="left")
+    return pd.DataFrame({"时间": times.strftime("%Y-%m-%d %H:%M:%S"), "数量": 1})
+
+
+def test_weeks_start_on_monday_and_are_labelled_by_first_day(hourly):
+    result = _trend(hourly, "week")
+
+    assert result["granularity"] == "week"
+    assert result["data"] == [
+        {"时间": "2022-12-26", "数量": 24},  # 只有周日 1 月 1 日
+        {"时间": "2023-01-02", "数量": 7 * 24},  # 1 月 2 日至 8 日
+        {"时间": "2023-01-09", "数量": 7 * 24},  # 1 月 9 日至 15 日
+    ]
+
+
+def test_monday_midnight_opens_a_new_week():
+    df = pd.DataFrame({
+        "时间": ["2023-01-08 23:59:59", "2023-01-09 00:00:00", "2023-01-15 23:59:59"],
+        "数量": [1, 10, 100],
+    })
+    assert _trend(df, "week")["data"] == [
+        {"时间": "2023-01-02", "数量": 1},
+        {"时间": "2023-01-09", "数量": 110},
+    ]
+
+
+@pytest.mark.parametrize("granularity,labels", [
+    ("day", ["2023-01-01", "2023-01-02"]),
+    ("month", ["2023-01"]),
+])
+def test_other_granularities_are_labelled_by_bucket_start(granularity, labels):
+    df = pd.DataFrame({"时间": ["2023-01-01 00:00:00", "2023-01-02 23:00:00"], "数量": [1, 2]})
+    assert [row["时间"] for row in _trend(df, granularity)["data"]] == labels
@@ -10,6 +10,8 @@ const queryClient = new QueryClient();
 
 function AppContent() {
   const [datasets, setDatasets] = useState<Dataset[]>([]);
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [selectedDataset, setSelectedDataset] = useState<Dataset | null>(null);
   const [notification, setNotification] = useState<{
     type: 'success' | 'error';
@@ -29,12 +31,15 @@ function AppContent() {
   const loadDatasets = async () => {
     try {
       setIsLoading(true);
-      const data = await datasetService.getDatasets();
+      // 只加载第一页，其余按需加载
+      const page = await datasetService.getDatasets();
+      const data = page.data;
       console.log('加载的数据集:', data);
       setDatasets(data || []);
+      setNextCursor(page.next_cursor);
       
       // 查找默认数据集
-      const defaultDataset = data?.find(d => d.file_path.includes('9bdfa9d8-39f3-4428-8b23-a510d4c68179.csv'));
+      const defaultDataset = data?.find(d => d.file_path?.includes('9bdfa9d8-39f3-4428-8b23-a510d4c68179.csv'));
       console.log('默认数据集:', defaultDataset);
       
       if (defaultDataset) {
@@ -59,6 +64,7 @@ function AppContent() {
     } catch (error) {
       console.error('加载数据集失败:', error);
       setDatasets([]);
+      setNextCursor(null);
       // 即使加载失败，也提供一个模拟数据集
       const mockDataset: Dataset = {
         id: 999,
@@ -77,6 +83,21 @@ function AppContent() {
     }
   };
 
+  // 加载下一页数据集
+  const loadMoreDatasets = async () => {
+    if (nextCursor === null) return;
+    try {
+      setIsLoadingMore(true);
+      const page = await datasetService.getDatasets(nextCursor);
+      setDatasets((prev) => [...prev, ...page.data]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      showNotification('error', '加载更多数据集失败');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleUploadSuccess = (result: UploadResponse) => {
     showNotification('success', `文件 ${result.name} 上传成功！`);
     loadDatasets();
@@ -206,7 +227,7 @@ function AppContent() {
                   数据集管理
                   {datasets && datasets.length > 0 && (
                     <span className="ml-2 text-sm text-gray-500">
-                      ({datasets.length} 个数据集)
+                      ({datasets.length}{nextCursor !== null ? '+' : ''} 个数据集)
                     </span>
                   )}
                 </h3>
@@ -337,6 +358,17 @@ function AppContent() {
                         </div>
                       ))}
                     </div>
+                    {nextCursor !== null && (
+                      <div className="mt-4 text-center">
+                        <button
+                          onClick={loadMoreDatasets}
+                          disabled={isLoadingMore}
+                          className="btn-secondary"
+                        >
+                          {isLoadingMore ? '加载中...' : '加载更多'}
+                        </button>
+                      </div>
+                    )}
                   </div>
                 ) : (
                   <div className="glass-card-solid p-12 text-center">
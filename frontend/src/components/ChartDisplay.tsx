@@ -200,26 +200,37 @@ const ChartDisplay: React.FC<ChartDisplayProps> = ({ chartConfig }) => {
         };
 
       case 'histogram':
-        // 计算直方图数据
-        const values = config.data.map(item => item[config.value_field!]);
-        const min = Math.min(...values);
-        const max = Math.max(...values);
-        const binCount = Math.min(Math.ceil(Math.sqrt(values.length)), 30); // 使用平方根法则，但限制最大箱数
-        const binWidth = (max - min) / binCount;
-        const bins = Array(binCount).fill(0);
-        
-        values.forEach(value => {
-          const binIndex = Math.min(Math.floor((value - min) / binWidth), binCount - 1);
-          bins[binIndex]++;
-        });
-
-        const binData = bins.map((count, i) => ({
-          value: count,
-          interval: [
-            min + i * binWidth,
-            min + (i + 1) * binWidth
-          ]
-        }));
+        // 服务端已分箱时直接使用分箱边界和计数
+        const computeBins = () => {
+          if (config.bins) {
+            return config.bins.counts.map((count, i) => ({
+              value: count,
+              interval: [config.bins!.edges[i], config.bins!.edges[i + 1]]
+            }));
+          }
+
+          // 计算直方图数据
+          const values = config.data.map(item => item[config.value_field!]);
+          const min = Math.min(...values);
+          const max = Math.max(...values);
+          const binCount = Math.min(Math.ceil(Math.sqrt(values.length)), 30); // 使用平方根法则，但限制最大箱数
+          const binWidth = (max - min) / binCount;
+          const bins = Array(binCount).fill(0);
+          
+          values.forEach(value => {
+            const binIndex = Math.min(Math.floor((value - min) / binWidth), binCount - 1);
+            bins[binIndex]++;
+          });
+
+          return bins.map((count, i) => ({
+            value: count,
+            interval: [
+              min + i * binWidth,
+              min + (i + 1) * binWidth
+            ]
+          }));
+        };
+        const binData = computeBins();
 
         return {
           ...baseOption,
@@ -292,11 +303,18 @@ const ChartDisplay: React.FC<ChartDisplayProps> = ({ chartConfig }) => {
           };
         };
 
-        const boxplotData = prepareBoxplotData(
-          config.data,
-          config.value_field!,
-          config.category_column
-        );
+        // 服务端已计算统计摘要时直接使用五数概括
+        const boxplotData = config.summary
+          ? config.data.map(item => ({
+              name: item.column,
+              boxData: [item.min, item.q1, item.median, item.q3, item.max],
+              outliers: []
+            }))
+          : prepareBoxplotData(
+              config.data,
+              config.value_field!,
+              config.category_column
+            );
 
         const isMultipleBoxplots = Array.isArray(boxplotData) && boxplotData.length > 0;
 
@@ -336,6 +354,46 @@ const ChartDisplay: React.FC<ChartDisplayProps> = ({ chartConfig }) => {
           }]
         };
 
+      case 'heatmap':
+        // 相关矩阵热力图
+        const heatmapColumns = config.columns || [];
+        return {
+          ...baseOption,
+          tooltip: {
+            position: 'top'
+          },
+          xAxis: {
+            type: 'category',
+            data: heatmapColumns,
+            axisLabel: { color: '#666', rotate: 30 }
+          },
+          yAxis: {
+            type: 'category',
+            data: heatmapColumns,
+            axisLabel: { color: '#666' }
+          },
+          visualMap: {
+            min: -1,
+            max: 1,
+            calculable: true,
+            orient: 'horizontal',
+            left: 'center',
+            bottom: 0,
+            inRange: {
+              color: ['#e53e3e', '#ffffff', '#667eea']
+            }
+          },
+          series: [{
+            type: 'heatmap',
+            data: config.data.map(item => [
+              heatmapColumns.indexOf(item.x),
+              heatmapColumns.indexOf(item.y),
+              item.value
+            ]),
+            label: { show: heatmapColumns.length <= 8 }
+          }]
+        };
+
       case 'table':
         return {
           ...baseOption,
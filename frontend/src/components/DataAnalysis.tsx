@@ -4,6 +4,9 @@ import { analysisService } from '../services/analysisService';
 import type { AnalysisResult, Dataset } from '../types/index';
 import ChartDisplay from './ChartDisplay';
 
+// 数据预览每页行数
+const PREVIEW_PAGE_SIZE = 10;
+
 interface DataAnalysisProps {
   dataset: Dataset;
 }
@@ -12,10 +15,13 @@ const DataAnalysis: React.FC<DataAnalysisProps> = ({ dataset }) => {
   const [question, setQuestion] = useState('');
   const [isAnalyzing, setIsAnalyzing] = useState(false);
   const [analysisResult, setAnalysisResult] = useState<AnalysisResult | null>(null);
+  const [streamingInsights, setStreamingInsights] = useState('');
   const [error, setError] = useState<string | null>(null);
   const [isPreviewOpen, setIsPreviewOpen] = useState(false);
   const [previewData, setPreviewData] = useState<any[]>([]);
   const [isLoadingPreview, setIsLoadingPreview] = useState(false);
+  const [previewOffset, setPreviewOffset] = useState(0);
+  const [previewTotal, setPreviewTotal] = useState(0);
 
   // 根据数据集类型获取推荐问题
   const getRecommendedQuestions = (dataset: Dataset) => {
@@ -62,18 +68,48 @@ const DataAnalysis: React.FC<DataAnalysisProps> = ({ dataset }) => {
 
     setIsAnalyzing(true);
     setError(null);
+    setAnalysisResult(null);
+    setStreamingInsights('');
 
     try {
-      const result = await analysisService.analyzeData({
+      let plan: Pick<AnalysisResult, 'query_type' | 'parameters' | 'reasoning'> | null = null;
+      await analysisService.analyzeDataStream({
         dataset_id: dataset.id,
         question: question.trim()
+      }, (message) => {
+        switch (message.event) {
+          case 'plan':
+            plan = message.data;
+            break;
+          case 'chart':
+            // 图表就绪后立即展示，洞察随后填充
+            setAnalysisResult({
+              ...plan!,
+              id: 0,
+              dataset_id: dataset.id,
+              question: question.trim(),
+              chart_config: message.data,
+              insights: [],
+              created_at: new Date().toISOString()
+            });
+            break;
+          case 'insight':
+            setStreamingInsights(prev => prev + message.data.delta);
+            break;
+          case 'insights':
+            setAnalysisResult(prev => prev && { ...prev, insights: message.data });
+            setStreamingInsights('');
+            break;
+          case 'done':
+            setAnalysisResult(prev => prev && { ...prev, id: message.data.analysis_id });
+            break;
+          case 'error':
+            throw new Error(message.data.detail);
+        }
       });
-      console.log('Analysis result:', result);
-      console.log('Chart config:', result.chart_config);
-      setAnalysisResult(result);
     } catch (err: any) {
       console.error('Analysis error:', err);
-      setError(err.response?.data?.detail || '分析失败，请重试');
+      setError(err.message || '分析失败，请重试');
     } finally {
       setIsAnalyzing(false);
     }
@@ -91,7 +127,7 @@ const DataAnalysis: React.FC<DataAnalysisProps> = ({ dataset }) => {
   };
 
   // 获取数据预览
-  const handlePreviewData = async () => {
+  const handlePreviewData = async (offset: number = 0) => {
     setIsLoadingPreview(true);
     try {
       // 如果是模拟数据集，使用本地数据
@@ -110,12 +146,16 @@ const DataAnalysis: React.FC<DataAnalysisProps> = ({ dataset }) => {
           { '日期': '2025-04-12', '订单编号': 'ORD1010', '商品名称': '连衣裙', '类别': '裙装', '售价': 169, '进价': 95, '销售数量': 2, '顾客类型': '普通顾客', '支付方式': '支付宝', '是否退货': '否', '店员': '小王' }
         ];
         setPreviewData(mockData);
+        setPreviewOffset(0);
+        setPreviewTotal(mockData.length);
       } else {
         // 如果是真实数据集，从API获取
         try {
           const { datasetService } = await import('../services/datasetService');
-          const data = await datasetService.previewDataset(dataset.id, 10);
-          setPreviewData(data.slice(0, 10)); // 确保只显示前10条
+          const page = await datasetService.previewDatasetPage(dataset.id, offset, PREVIEW_PAGE_SIZE);
+          setPreviewData(page.data);
+          setPreviewOffset(page.offset);
+          setPreviewTotal(page.total_rows);
         } catch (error) {
           console.error('获取数据失败:', error);
           setError('获取数据预览失败');
@@ -139,7 +179,7 @@ const DataAnalysis: React.FC<DataAnalysisProps> = ({ dataset }) => {
             <Database className="w-6 h-6 mr-2 text-primary-500" />
             <h3 className="text-xl font-bold text-gray-800">{dataset.name}</h3>
             <button
-              onClick={handlePreviewData}
+              onClick={() => handlePreviewData()}
               disabled={isLoadingPreview}
               className="ml-3 p-2 text-gray-500 hover:text-primary-500 hover:bg-primary-50 rounded-lg transition-all duration-200"
               title="查看数据预览"
@@ -288,6 +328,17 @@ const DataAnalysis: React.FC<DataAnalysisProps> = ({ dataset }) => {
               <TrendingUp className="w-5 h-5 mr-2 text-primary-500" />
               智能洞察
             </h4>
+            {analysisResult.insights.length === 0 && isAnalyzing && (
+              <div className="p-4 bg-gray-50 rounded-lg text-gray-500 text-sm">
+                <div className="flex items-center space-x-2 mb-2">
+                  <div className="loading-spinner"></div>
+                  <span>正在生成洞察...</span>
+                </div>
+                {streamingInsights && (
+                  <pre className="whitespace-pre-wrap break-all">{streamingInsights}</pre>
+                )}
+              </div>
+            )}
             <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
               {analysisResult.insights.map((insight, index) => (
                 <div
@@ -369,6 +420,29 @@ const DataAnalysis: React.FC<DataAnalysisProps> = ({ dataset }) => {
                 </div>
               )}
             </div>
+            {previewTotal > PREVIEW_PAGE_SIZE && (
+              <div className="p-4 border-t border-gray-200 flex justify-between items-center text-sm text-gray-600">
+                <span>
+                  第 {previewOffset + 1}-{previewOffset + previewData.length} 行，共 {previewTotal} 行
+                </span>
+                <div className="space-x-2">
+                  <button
+                    onClick={() => handlePreviewData(Math.max(previewOffset - PREVIEW_PAGE_SIZE, 0))}
+                    disabled={isLoadingPreview || previewOffset === 0}
+                    className="btn-secondary text-sm"
+                  >
+                    上一页
+                  </button>
+                  <button
+                    onClick={() => handlePreviewData(previewOffset + PREVIEW_PAGE_SIZE)}
+                    disabled={isLoadingPreview || previewOffset + PREVIEW_PAGE_SIZE >= previewTotal}
+                    className="btn-secondary text-sm"
+                  >
+                    下一页
+                  </button>
+                </div>
+              </div>
+            )}
           </div>
         </div>
       )}
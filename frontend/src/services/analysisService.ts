@@ -1,5 +1,5 @@
-import api from './api';
-import type { AnalysisRequest, AnalysisResult } from '../types/index';
+import api, { API_BASE_URL } from './api';
+import type { AnalysisRequest, AnalysisResult, AnalysisStreamEvent } from '../types/index';
 
 export const analysisService = {
   // 分析数据
@@ -7,9 +7,49 @@ export const analysisService = {
     return await api.post('/analysis/query', request);
   },
 
+  // 流式分析数据：先收到查询计划和图表，再逐段收到洞察
+  analyzeDataStream: async (
+    request: AnalysisRequest,
+    onEvent: (event: AnalysisStreamEvent) => void
+  ): Promise<void> => {
+    const response = await fetch(`${API_BASE_URL}/api/v1/analysis/query/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(request),
+    });
+    if (!response.ok || !response.body) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.detail || '分析失败，请重试');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // 事件之间以空行分隔
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const event = block.match(/^event: (.*)$/m)?.[1];
+        const data = block.match(/^data: (.*)$/m)?.[1];
+        if (event && data) {
+          onEvent({ event, data: JSON.parse(data) } as AnalysisStreamEvent);
+        }
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+  },
+
   // 获取分析历史
-  getAnalysisHistory: async (datasetId: number, limit: number = 20) => {
-    return await api.get(`/analysis/history/${datasetId}?limit=${limit}`);
+  getAnalysisHistory: async (datasetId: number, limit: number = 20, cursor?: number) => {
+    return await api.get(`/analysis/history/${datasetId}`, {
+      params: { limit, ...(cursor !== undefined ? { cursor } : {}) }
+    });
   },
 
   // 获取分析详情
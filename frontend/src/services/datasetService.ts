@@ -1,19 +1,47 @@
 import api from './api';
-import type { Dataset, UploadResponse } from '../types/index';
+import type { CursorPage, Dataset, DatasetPreview, IngestionJob, UploadResponse } from '../types/index';
+
+// 入库任务轮询间隔（毫秒）
+const JOB_POLL_INTERVAL = 1000;
+
+// 数据集列表每页条数
+const DATASET_PAGE_SIZE = 30;
 
 export const datasetService = {
-  // 上传数据集
-  uploadDataset: async (file: File): Promise<UploadResponse> => {
+  // 上传数据集：提交后轮询入库任务，处理完成后返回数据集信息
+  uploadDataset: async (
+    file: File,
+    onProgress?: (job: IngestionJob) => void
+  ): Promise<UploadResponse> => {
     const formData = new FormData();
     formData.append('file', file);
-    const response = await api.post('/datasets/upload', formData);
-    return response.data;
+    // 响应拦截器已返回响应体
+    const submitted: any = await api.post('/datasets/upload', formData);
+
+    for (;;) {
+      const job = await datasetService.getIngestionJob(submitted.job_id);
+      onProgress?.(job);
+      if (job.status === 'succeeded') {
+        return job.dataset as any;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || '文件处理失败');
+      }
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL));
+    }
   },
 
-  // 获取数据集列表
-  getDatasets: async (): Promise<Dataset[]> => {
-    const response = await api.get('/datasets/');
-    return response.data;
+  // 获取入库任务状态
+  getIngestionJob: async (jobId: number): Promise<IngestionJob> => {
+    const job: any = await api.get(`/datasets/jobs/${jobId}`);
+    return job;
+  },
+
+  // 获取一页数据集列表，next_cursor 用于加载下一页
+  getDatasets: async (cursor?: number, limit: number = DATASET_PAGE_SIZE): Promise<CursorPage<Dataset>> => {
+    return await api.get('/datasets/', {
+      params: { limit, ...(cursor !== undefined ? { cursor } : {}) }
+    });
   },
 
   // 获取单个数据集
@@ -28,6 +56,11 @@ export const datasetService = {
     return response.data;
   },
 
+  // 分页预览数据集数据
+  previewDatasetPage: async (id: number, offset: number, limit: number): Promise<DatasetPreview> => {
+    return await api.get(`/datasets/${id}/preview?offset=${offset}&limit=${limit}`);
+  },
+
   // 删除数据集
   deleteDataset: async (id: number): Promise<void> => {
     await api.delete(`/datasets/${id}`);
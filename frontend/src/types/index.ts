@@ -48,6 +48,14 @@ export interface AnalysisResult {
   created_at: string;
 }
 
+export type AnalysisStreamEvent =
+  | { event: 'plan'; data: Pick<AnalysisResult, 'query_type' | 'parameters' | 'reasoning'> }
+  | { event: 'chart'; data: ChartConfig }
+  | { event: 'insight'; data: { delta: string } }
+  | { event: 'insights'; data: Insight[] }
+  | { event: 'done'; data: { analysis_id: number } }
+  | { event: 'error'; data: { detail: string } };
+
 export interface BoxplotData {
   boxData: number[];
   outliers: number[];
@@ -55,17 +63,27 @@ export interface BoxplotData {
 }
 
 export interface ChartConfig {
-  chart_type: 'line' | 'bar' | 'pie' | 'scatter' | 'histogram' | 'boxplot' | 'table';
+  chart_type: 'line' | 'bar' | 'pie' | 'scatter' | 'histogram' | 'boxplot' | 'heatmap' | 'table';
   data: any[];
   x_axis?: string;
   y_axis?: string;
   name_field?: string;
   value_field?: string;
   category_column?: string;
+  bins?: HistogramBins;
+  columns?: string[];
+  matrix?: (number | null)[][];
+  summary?: boolean;
   title?: string;
   subtitle?: string;
 }
 
+export interface HistogramBins {
+  edges: number[];
+  counts: number[];
+  method: string;
+}
+
 export interface Insight {
   title: string;
   description: string;
@@ -75,4 +93,30 @@ export interface Insight {
 export interface UploadResponse {
   dataset: Dataset;
   message: string;
-} 
\ No newline at end of file
+} 
+
+export interface CursorPage<T> {
+  data: T[];
+  next_cursor: number | null;
+}
+
+export interface DatasetPreview {
+  total_rows: number;
+  offset: number;
+  limit: number;
+  preview_rows: number;
+  columns: string[];
+  data: any[];
+}
+
+export interface IngestionJob {
+  job_id: number;
+  status: 'pending' | 'running' | 'succeeded' | 'failed';
+  stage: string;
+  progress: number;
+  file_name: string;
+  error?: string | null;
+  created_at: string;
+  updated_at?: string | null;
+  dataset?: (Partial<Dataset> & { columns?: Column[] }) | null;
+}